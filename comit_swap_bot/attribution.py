@@ -5,6 +5,10 @@ This module handles proper attribution for APIs we use, ensuring
 compliance with their terms of service.
 """
 
+from collections.abc import Mapping
+from functools import cache
+from types import MappingProxyType
+
 from .config import config
 
 
@@ -14,24 +18,31 @@ class AttributionManager:
 
     Ensures we properly credit data providers like CoinGecko to maintain
     compliance with their API terms and keep access to free data.
+
+    Outputs only depend on config fixed at startup, so each method is
+    memoized and hands back the same object on every call.
     """
 
     @staticmethod
-    def get_coingecko_attribution() -> dict:
+    @cache
+    def get_coingecko_attribution() -> Mapping:
         """
         Get CoinGecko attribution information.
 
         Returns:
-            dict: Attribution text and link information
+            Mapping: Read-only attribution text and link information
         """
-        return {
-            "text": config.coingecko_attribution_text,
-            "url": config.coingecko_attribution_url,
-            "logo_required": True,
-            "placement": "near_price_data",
-        }
+        return MappingProxyType(
+            {
+                "text": config.coingecko_attribution_text,
+                "url": config.coingecko_attribution_url,
+                "logo_required": True,
+                "placement": "near_price_data",
+            }
+        )
 
     @staticmethod
+    @cache
     def format_attribution_for_twitter() -> str:
         """
         Format attribution text for Twitter posts.
@@ -42,6 +53,7 @@ class AttributionManager:
         return f"💱 {config.coingecko_attribution_text}"
 
     @staticmethod
+    @cache
     def format_attribution_for_discord() -> str:
         """
         Format attribution text for Discord messages.
@@ -52,6 +64,7 @@ class AttributionManager:
         return f"💱 [{config.coingecko_attribution_text}]({config.coingecko_attribution_url})"
 
     @staticmethod
+    @cache
     def get_utm_tracking_url(source_name: str = "comit-swap-bot") -> str:
         """
         Generate UTM-tracked attribution URL.
@@ -5,17 +5,33 @@ import signal
 import sys
 
 import click
+import orjson
 import structlog
 from structlog.stdlib import LoggerFactory
 
 from . import __version__
 from .config import config
 from .database import SwapDatabase
+from .event_loop import install_uvloop
+from .models import NOTIFIED_WITHOUT_TWEET
 from .notifiers import NotificationManager
 from .orchestrator import SwapOrchestrator
 from .price_fetcher import PriceFetcher
 from .swap_watcher import SwapWatcher
 
+
+def _orjson_dumps(obj, **kwargs) -> str:
+    """orjson serializer for structlog; stdlib logging wants str, not bytes."""
+    return orjson.dumps(obj, **kwargs).decode()
+
+
+def _log_renderer():
+    """Pretty, colored output on a terminal; JSON lines everywhere else."""
+    if sys.stderr.isatty():
+        return structlog.dev.ConsoleRenderer()
+    return structlog.processors.JSONRenderer(serializer=_orjson_dumps, default=str)
+
+
 structlog.configure(
     processors=[
         structlog.stdlib.filter_by_level,
@@ -25,7 +41,7 @@ structlog.configure(
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
-        structlog.dev.ConsoleRenderer(),
+        _log_renderer(),
     ],
     context_class=dict,
     logger_factory=LoggerFactory(),
@@ -62,28 +78,39 @@ def watch(check_interval: int):
         notifier = NotificationManager()
 
         orchestrator = SwapOrchestrator(
-            watcher=watcher, price_fetcher=price_fetcher, notifier=notifier, database=db
+            mempool_watcher=watcher,
+            price_service=price_fetcher,
+            notification_mgr=notifier,
+            swap_db=db,
         )
 
-        # Setup signal handlers
-        loop = asyncio.get_event_loop()
-
-        def signal_handler(sig):
-            logger.info("Received signal, shutting down", signal=sig)
-            loop.create_task(orchestrator.stop())
-
+        # Signals only flip an event; teardown runs exactly once below
+        loop = asyncio.get_running_loop()
+        shutdown = asyncio.Event()
         for sig in (signal.SIGTERM, signal.SIGINT):
-            loop.add_signal_handler(sig, lambda s=sig: signal_handler(s))
+            loop.add_signal_handler(sig, shutdown.set)
 
         # Start watching
+        main_task = asyncio.create_task(orchestrator.start())
+        shutdown_task = asyncio.create_task(shutdown.wait())
         try:
-            await orchestrator.start()
+            done, _ = await asyncio.wait(
+                [main_task, shutdown_task], return_when=asyncio.FIRST_COMPLETED
+            )
+            if main_task in done:
+                main_task.result()
+            else:
+                logger.info("Received signal, shutting down")
         except Exception as e:
             logger.error("Fatal error", error=str(e), exc_info=True)
             sys.exit(1)
         finally:
+            shutdown_task.cancel()
+            await orchestrator.stop()
+            await asyncio.gather(main_task, return_exceptions=True)
             await db.close()
             await price_fetcher.close()
+            await notifier.close()
 
     asyncio.run(run())
 
@@ -118,7 +145,10 @@ def check(txid: str):
 @cli.command()
 @click.option("--start-height", required=True, type=int, help="Starting block height")
 @click.option("--end-height", required=True, type=int, help="Ending block height")
-def backfill(start_height: int, end_height: int):
+@click.option(
+    "--concurrency", default=16, help="Number of blocks to fetch concurrently"
+)
+def backfill(start_height: int, end_height: int, concurrency: int):
     """Backfill historical swaps between block heights."""
 
     async def run():
@@ -130,13 +160,20 @@ def backfill(start_height: int, end_height: int):
         notifier = NotificationManager()
 
         orchestrator = SwapOrchestrator(
-            watcher=watcher, price_fetcher=price_fetcher, notifier=notifier, database=db
+            mempool_watcher=watcher,
+            price_service=price_fetcher,
+            notification_mgr=notifier,
+            swap_db=db,
+            enable_health_server=False,
         )
 
-        await orchestrator.backfill(start_height, end_height)
+        await orchestrator.run_historical_backfill(
+            start_height, end_height, concurrency=concurrency
+        )
 
         await db.close()
         await price_fetcher.close()
+        await notifier.close()
 
     asyncio.run(run())
 
@@ -156,18 +193,23 @@ def list_swaps(limit: int):
             click.echo("No swaps found")
             return
 
-        click.echo(f"Recent {len(swaps)} swaps:\n")
-
+        # Build the whole listing and write it once rather than per field
+        lines = [f"Recent {len(swaps)} swaps:", ""]
         for swap in swaps:
-            click.echo(f"Swap ID: {swap.swap_id}")
-            click.echo(f"  State: {swap.current_state.value}")
-            click.echo(f"  Amount: {swap.btc_amount} BTC")
+            lines.append(
+                f"Swap ID: {swap.swap_id}\n"
+                f"  State: {swap.current_state.value}\n"
+                f"  Amount: {swap.btc_amount} BTC"
+            )
             if swap.xmr_amount:
-                click.echo(f"  XMR: {swap.xmr_amount} XMR")
-            click.echo(f"  Created: {swap.detected_at}")
-            if hasattr(swap, "tweet_id") and swap.tweet_id:
-                click.echo(f"  Tweet: https://twitter.com/i/status/{swap.tweet_id}")
-            click.echo()
+                lines.append(f"  XMR: {swap.xmr_amount} XMR")
+            lines.append(f"  Created: {swap.detected_at}")
+            if swap.notification_sent not in (None, NOTIFIED_WITHOUT_TWEET):
+                lines.append(
+                    f"  Tweet: https://twitter.com/i/status/{swap.notification_sent}"
+                )
+            lines.append("")
+        click.echo("\n".join(lines))
 
         await db.close()
 
@@ -176,6 +218,7 @@ def list_swaps(limit: int):
 
 def main():
     """Main entry point."""
+    install_uvloop()
     cli()
 
 
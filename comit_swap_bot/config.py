@@ -1,6 +1,8 @@
 """Configuration management for the swap bot."""
 
-from pydantic import Field, validator
+from functools import lru_cache
+
+from pydantic import Field, ValidationInfo, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -11,6 +13,7 @@ class Config(BaseSettings):
         env_file=".env",
         env_file_encoding="utf-8",
         case_sensitive=False,
+        frozen=True,
     )
 
     # Bitcoin Configuration
@@ -66,6 +69,15 @@ class Config(BaseSettings):
         description="Attribution link for CoinGecko",
     )
 
+    # Price Cache Configuration
+    enable_price_cache: bool = Field(
+        default=False, description="Persist fetched CoinGecko rates to disk"
+    )
+    price_cache_dir: str = Field(
+        default="/var/cache/comit-swap-bot/prices",
+        description="Directory for the on-disk price cache",
+    )
+
     # Database Configuration
     database_url: str = Field(
         default="sqlite+aiosqlite:///swaps.db",
@@ -92,18 +104,26 @@ class Config(BaseSettings):
         default_factory=list, description="List of Apprise notification URLs"
     )
 
-    @validator(
+    @field_validator(
         "twitter_api_key",
         "twitter_api_secret",
         "twitter_access_token",
         "twitter_access_token_secret",
+        mode="after",
     )
-    def validate_twitter_config(cls, v, values):
+    @classmethod
+    def validate_twitter_config(cls, v, info: ValidationInfo):
         """Validate Twitter configuration."""
-        if values.get("enable_twitter") and not v:
+        if info.data.get("enable_twitter") and not v:
             raise ValueError("Twitter credentials required when Twitter is enabled")
         return v
 
 
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Load the configuration once and reuse it for the life of the process."""
+    return Config()
+
+
 # Global config instance
-config = Config()
+config = get_config()
@@ -6,49 +6,113 @@ The schema has evolved over time as I discovered edge cases - initially
 didn't account for partial redemptions or multiple refund attempts.
 """
 
+import asyncio
+
 import structlog
-from sqlalchemy import Column, DateTime, Index, Numeric, String, Text, text
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from cachetools import TTLCache
+from sqlalchemy import (
+    Column,
+    Computed,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    bindparam,
+    event,
+    text,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.orm import declarative_base
 
 from .config import config
-from .models import AtomicSwap, SwapState
+from .models import (
+    ATOMIC_SWAP_ADAPTER,
+    ATOMIC_SWAP_LIST_ADAPTER,
+    AtomicSwap,
+    SwapState,
+)
 
 logger = structlog.get_logger()
 Base = declarative_base()
 
+# Read statements are built once at import; bound parameter types are fixed so
+# SQLAlchemy can reuse the compiled form from its statement cache.
+_SELECT_BY_SWAP_ID = text(
+    "SELECT full_swap_json FROM atomic_swaps WHERE swap_id = :swap_id"
+).bindparams(bindparam("swap_id", type_=String))
+_SELECT_BY_LOCK_TXID = text(
+    "SELECT full_swap_json FROM atomic_swaps WHERE lock_txid = :txid"
+).bindparams(bindparam("txid", type_=String))
+_SELECT_BY_STATE = text(
+    "SELECT full_swap_json FROM atomic_swaps WHERE current_state = :state"
+).bindparams(bindparam("state", type_=String))
+_SELECT_UNNOTIFIED_KEYS = text(
+    "SELECT swap_id, lock_txid FROM atomic_swaps "
+    "WHERE current_state = :state AND notification_sent IS NULL"
+).bindparams(bindparam("state", type_=String))
+_SELECT_RECENT = text(
+    "SELECT full_swap_json FROM atomic_swaps ORDER BY detected_at DESC LIMIT :limit"
+).bindparams(bindparam("limit", type_=Integer))
+_UPDATE_TWEET_ID = text(
+    "UPDATE atomic_swaps "
+    "SET full_swap_json = json_set(full_swap_json, '$.notification_sent', :tweet_id) "
+    "WHERE swap_id = :swap_id RETURNING lock_txid"
+).bindparams(bindparam("tweet_id", type_=String), bindparam("swap_id", type_=String))
+# Touches only the pricing fields, so it can't undo a state change saved since
+# the swap was read
+_UPDATE_PRICES = text(
+    "UPDATE atomic_swaps SET full_swap_json = json_set(full_swap_json, "
+    "'$.btc_xmr_rate', :btc_xmr_rate, '$.xmr_amount', :xmr_amount, "
+    "'$.last_updated', :last_updated) WHERE swap_id = :swap_id"
+).bindparams(
+    bindparam("btc_xmr_rate", type_=String),
+    bindparam("xmr_amount", type_=String),
+    bindparam("last_updated", type_=String),
+    bindparam("swap_id", type_=String),
+)
+_PRICE_FIELDS = {"btc_xmr_rate", "xmr_amount", "last_updated"}
+
+
+def _from_json(path: str) -> Computed:
+    """Virtual generated column reading a field out of full_swap_json."""
+    return Computed(f"json_extract(full_swap_json, '{path}')", persisted=False)
+
 
 class SwapRecord(Base):
     """
     SQLite table schema for atomic swap persistence.
 
-    Stores both normalized fields for querying and a JSON blob
-    with the complete swap data for easy serialization.
+    Only the swap ID and the complete JSON record are written. The
+    queryable fields are virtual generated columns that SQLite derives
+    from the JSON, so they can never drift out of sync with it.
     """
 
     __tablename__ = "atomic_swaps"
 
     # Primary identification
     swap_id = Column(String, primary_key=True)
-    lock_txid = Column(String, nullable=False, index=True)
-    redeem_txid = Column(String, nullable=True)
-    refund_txid = Column(String, nullable=True)
+    lock_txid = Column(
+        String, _from_json("$.lock_transaction.txid"), nullable=False, index=True
+    )
+    redeem_txid = Column(String, _from_json("$.redeem_transaction.txid"))
+    refund_txid = Column(String, _from_json("$.refund_transaction.txid"))
 
     # State tracking
-    current_state = Column(String, nullable=False)
+    current_state = Column(String, _from_json("$.current_state"), nullable=False)
 
     # Financial data
-    btc_amount = Column(Numeric(16, 8), nullable=False)
-    xmr_amount = Column(Numeric(16, 8), nullable=True)
-    btc_xmr_rate = Column(Numeric(16, 8), nullable=True)
+    btc_amount = Column(Numeric(16, 8), _from_json("$.btc_amount"), nullable=False)
+    xmr_amount = Column(Numeric(16, 8), _from_json("$.xmr_amount"))
+    btc_xmr_rate = Column(Numeric(16, 8), _from_json("$.btc_xmr_rate"))
 
-    # Timestamps
-    detected_at = Column(DateTime, nullable=False)
-    last_updated = Column(DateTime, nullable=False)
+    # Timestamps, as the ISO-8601 text stored in the JSON
+    detected_at = Column(String, _from_json("$.detected_at"), nullable=False)
+    last_updated = Column(String, _from_json("$.last_updated"), nullable=False)
 
     # Social media tracking
-    notification_sent = Column(String, nullable=True)
+    notification_sent = Column(String, _from_json("$.notification_sent"))
 
     # Complete record as JSON for flexibility
     full_swap_json = Column(Text, nullable=False)
@@ -56,10 +120,110 @@ class SwapRecord(Base):
     __table_args__ = (
         Index("idx_detection_time", "detected_at"),
         Index("idx_swap_state", "current_state"),
+        Index("idx_state_time", "current_state", "detected_at"),
         Index("idx_notification_status", "notification_sent"),
     )
 
 
+def _decode_swaps(blobs: list[str | bytes]) -> list[AtomicSwap]:
+    """Validate a batch of stored swap JSON blobs in one pass."""
+    if not blobs:
+        return []
+    joined = b",".join(
+        blob if isinstance(blob, (bytes, bytearray)) else blob.encode()
+        for blob in blobs
+    )
+    return ATOMIC_SWAP_LIST_ADAPTER.validate_json(b"[" + joined + b"]")
+
+
+# Upsert keyed on swap_id; executed with a list of rows it runs as one
+# executemany inside a single transaction instead of merge() per record.
+_UPSERT_SWAP = sqlite_insert(SwapRecord.__table__)
+_UPSERT_SWAP = _UPSERT_SWAP.on_conflict_do_update(
+    index_elements=["swap_id"],
+    set_={"full_swap_json": _UPSERT_SWAP.excluded.full_swap_json},
+)
+
+# Applied to every new SQLite connection: WAL so commits don't fsync a rollback
+# journal, plus a 64 MB page cache and 256 MB of mmap for the read paths.
+SQLITE_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "mmap_size=268435456",
+    "cache_size=-65536",
+    "temp_store=MEMORY",
+)
+
+
+def _set_sqlite_pragmas(dbapi_conn, connection_record):
+    """Configure a freshly opened SQLite connection."""
+    cursor = dbapi_conn.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+
+def _swap_to_row(swap: AtomicSwap) -> dict:
+    """Serialize a swap into the two stored columns."""
+    return {
+        "swap_id": swap.swap_id,
+        "full_swap_json": swap.to_json(),
+    }
+
+
+# Hot queries that must be served from an index, with dummy parameters for
+# EXPLAIN QUERY PLAN. A schema drift that breaks one of these would silently
+# turn an indexed lookup into a full table scan.
+_INDEXED_QUERIES = {
+    "by_swap_id": (_SELECT_BY_SWAP_ID, {"swap_id": ""}),
+    "by_lock_txid": (_SELECT_BY_LOCK_TXID, {"txid": ""}),
+    "pending": (_SELECT_BY_STATE, {"state": ""}),
+    "pending_keys": (_SELECT_UNNOTIFIED_KEYS, {"state": ""}),
+    "recent": (_SELECT_RECENT, {"limit": 10}),
+}
+
+
+def _check_query_plans(sync_conn):
+    """Warn about any hot query the SQLite planner won't serve from an index."""
+    for name, (stmt, params) in _INDEXED_QUERIES.items():
+        rows = sync_conn.execute(text(f"EXPLAIN QUERY PLAN {stmt.text}"), params)
+        plan = " | ".join(row[3] for row in rows)
+        if "USING INDEX" not in plan and "USING COVERING INDEX" not in plan:
+            logger.warning("Query is not using an index", query=name, plan=plan)
+
+
+# Tables created before the generated columns existed hold real copies of
+# these fields; _migrate_legacy_table rebuilds them from the JSON.
+_LEGACY_TABLE = "atomic_swaps_legacy"
+
+
+def _migrate_legacy_table(sync_conn):
+    """Rebuild an atomic_swaps table that predates generated columns."""
+    columns = sync_conn.exec_driver_sql("PRAGMA table_xinfo(atomic_swaps)").all()
+    # table_xinfo marks virtual generated columns with hidden == 2
+    if not columns or any(col[6] == 2 for col in columns):
+        return
+
+    logger.info("Migrating atomic_swaps to generated columns")
+    sync_conn.exec_driver_sql(f"ALTER TABLE atomic_swaps RENAME TO {_LEGACY_TABLE}")
+    legacy_indexes = sync_conn.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'index' "
+        f"AND tbl_name = '{_LEGACY_TABLE}' AND sql IS NOT NULL"
+    ).all()
+    for (name,) in legacy_indexes:
+        sync_conn.exec_driver_sql(f'DROP INDEX "{name}"')
+
+    Base.metadata.create_all(sync_conn)
+    # Tweet IDs used to live only in the notification_sent column
+    sync_conn.exec_driver_sql(
+        "INSERT INTO atomic_swaps (swap_id, full_swap_json) "
+        "SELECT swap_id, CASE WHEN notification_sent IS NULL THEN full_swap_json "
+        "ELSE json_set(full_swap_json, '$.notification_sent', notification_sent) "
+        f"END FROM {_LEGACY_TABLE}"
+    )
+    sync_conn.exec_driver_sql(f"DROP TABLE {_LEGACY_TABLE}")
+
+
 class SwapDatabase:
     """
     Database operations for atomic swap persistence.
@@ -70,97 +234,167 @@ class SwapDatabase:
 
     def __init__(self):
         """Initialize database connection."""
-        self.engine = create_async_engine(
-            config.database_url, echo=False, pool_pre_ping=True
-        )
-        self.async_session = sessionmaker(
-            self.engine, class_=AsyncSession, expire_on_commit=False
-        )
+        # No pre-ping: the database is a local file, so a SELECT 1 on every
+        # checkout only adds a round trip through the aiosqlite thread.
+        self.engine = create_async_engine(config.database_url, echo=False)
+        if self.engine.dialect.name == "sqlite":
+            event.listen(self.engine.sync_engine, "connect", _set_sqlite_pragmas)
+        # Long-lived connection shared by all reads, opened in init(). Writes
+        # each run in their own engine.begin() transaction.
+        self._conn: AsyncConnection | None = None
+        self._read_lock = asyncio.Lock()
+
+        # Point lookups repeat a lot as blocks propagate, so keep recently
+        # seen swaps in memory. Writes refresh these; negatives aren't cached.
+        self._by_id: TTLCache = TTLCache(maxsize=4096, ttl=60)
+        self._by_lock: TTLCache = TTLCache(maxsize=4096, ttl=60)
+        self._inflight: dict[tuple[str, str], asyncio.Event] = {}
+        # Bumped by every write; a read that overlapped one doesn't cache
+        # what it read, since the row may already be stale
+        self._write_gen = 0
 
     async def init(self):
         """Initialize database schema."""
         async with self.engine.begin() as conn:
+            await conn.run_sync(_migrate_legacy_table)
             await conn.run_sync(Base.metadata.create_all)
+            if self.engine.dialect.name == "sqlite":
+                await conn.run_sync(_check_query_plans)
+        self._conn = await self.engine.connect()
+        # Autocommit so the read connection never pins a stale snapshot
+        await self._conn.execution_options(isolation_level="AUTOCOMMIT")
         logger.info("Database initialized")
 
     async def close(self):
         """Close database connection."""
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
         await self.engine.dispose()
 
+    async def _fetch_rows(self, stmt, params: dict) -> list:
+        """Run a read statement on the shared connection."""
+        async with self._read_lock:
+            result = await self._conn.execute(stmt, params)
+            return result.all()
+
+    async def _fetch_json(self, stmt, params: dict) -> list[str]:
+        """Run a read statement and return the first column of each row."""
+        return [row[0] for row in await self._fetch_rows(stmt, params)]
+
+    def _cache_swap(self, swap: AtomicSwap):
+        """Store a copy of a swap under both lookup keys."""
+        cached = swap.model_copy()
+        self._by_id[swap.swap_id] = cached
+        self._by_lock[swap.lock_transaction.txid] = cached
+
+    def _evict_swap(self, swap_id: str, lock_txid: str):
+        """Drop a swap from both lookup caches after a partial update."""
+        self._write_gen += 1
+        # The caches expire independently, so each is evicted by its own key
+        self._by_id.pop(swap_id, None)
+        self._by_lock.pop(lock_txid, None)
+
+    async def _cached_get(
+        self, cache: TTLCache, kind: str, key: str, stmt, params: dict
+    ) -> AtomicSwap | None:
+        """Look up a single swap, collapsing concurrent misses for one key."""
+        flight_key = (kind, key)
+        while (event := self._inflight.get(flight_key)) is not None:
+            await event.wait()
+
+        swap = cache.get(key)
+        if swap is not None:
+            return swap.model_copy()
+
+        event = self._inflight[flight_key] = asyncio.Event()
+        write_gen = self._write_gen
+        try:
+            rows = await self._fetch_json(stmt, params)
+        finally:
+            del self._inflight[flight_key]
+            event.set()
+
+        if not rows:
+            return None
+        swap = ATOMIC_SWAP_ADAPTER.validate_json(rows[0])
+        if write_gen == self._write_gen:
+            self._cache_swap(swap)
+        return swap
+
     async def save_swap(self, swap: AtomicSwap):
         """Save or update a swap record."""
-        async with self.async_session() as session:
-            record = SwapRecord(
-                swap_id=swap.swap_id,
-                lock_txid=swap.lock_transaction.txid,
-                redeem_txid=swap.redeem_transaction.txid
-                if swap.redeem_transaction
-                else None,
-                refund_txid=swap.refund_transaction.txid
-                if swap.refund_transaction
-                else None,
-                current_state=swap.current_state.value,
-                btc_amount=swap.btc_amount,
-                xmr_amount=swap.xmr_amount,
-                btc_xmr_rate=swap.btc_xmr_rate,
-                detected_at=swap.detected_at,
-                last_updated=swap.last_updated,
-                notification_sent=getattr(swap, "notification_sent", None),
-                full_swap_json=swap.model_dump_json(),
-            )
+        await self.save_swaps([swap])
 
-            await session.merge(record)
-            await session.commit()
+    async def save_swaps(self, swaps: list[AtomicSwap]):
+        """Save or update a batch of swap records in one transaction."""
+        if not swaps:
+            return
+        async with self.engine.begin() as conn:
+            await conn.execute(_UPSERT_SWAP, [_swap_to_row(swap) for swap in swaps])
+        self._write_gen += 1
+        for swap in swaps:
+            self._cache_swap(swap)
+
+    async def save_swap_prices(self, swaps: list[AtomicSwap]):
+        """Write just the pricing fields of a batch of swaps in one transaction."""
+        if not swaps:
+            return
+        rows = [
+            {
+                "swap_id": swap.swap_id,
+                # Serialized the same way to_json() writes them
+                **swap.model_dump(mode="json", include=_PRICE_FIELDS),
+            }
+            for swap in swaps
+        ]
+        async with self.engine.begin() as conn:
+            await conn.execute(_UPDATE_PRICES, rows)
+        for swap in swaps:
+            self._evict_swap(swap.swap_id, swap.lock_transaction.txid)
 
     async def get_swap(self, swap_id: str) -> AtomicSwap | None:
         """Get a swap by ID."""
-        async with self.async_session() as session:
-            result = await session.get(SwapRecord, swap_id)
-            if result:
-                return AtomicSwap.model_validate_json(result.full_swap_json)
-            return None
+        return await self._cached_get(
+            self._by_id, "id", swap_id, _SELECT_BY_SWAP_ID, {"swap_id": swap_id}
+        )
 
     async def get_swap_by_lock_txid(self, txid: str) -> AtomicSwap | None:
         """Get a swap by its lock transaction ID."""
-        async with self.async_session() as session:
-            result = await session.execute(
-                text("SELECT full_swap_json FROM atomic_swaps WHERE lock_txid = :txid"),
-                {"txid": txid},
-            )
-            row = result.first()
-            if row:
-                return AtomicSwap.model_validate_json(row[0])
-            return None
+        return await self._cached_get(
+            self._by_lock, "lock", txid, _SELECT_BY_LOCK_TXID, {"txid": txid}
+        )
 
     async def get_pending_swaps(self) -> list[AtomicSwap]:
         """Get all swaps in locked state."""
-        async with self.async_session() as session:
-            result = await session.execute(
-                text(
-                    "SELECT full_swap_json FROM atomic_swaps WHERE current_state = :state"
-                ),
-                {"state": SwapState.LOCKED.value},
-            )
-            return [AtomicSwap.model_validate_json(row[0]) for row in result]
+        rows = await self._fetch_json(
+            _SELECT_BY_STATE, {"state": SwapState.LOCKED.value}
+        )
+        return _decode_swaps(rows)
+
+    async def get_pending_swap_keys(self) -> list[tuple[str, str]]:
+        """
+        Get (swap_id, lock_txid) for locked swaps not yet notified about.
+
+        The JSON isn't loaded; the caller fetches the records it needs.
+        """
+        rows = await self._fetch_rows(
+            _SELECT_UNNOTIFIED_KEYS, {"state": SwapState.LOCKED.value}
+        )
+        return [(row[0], row[1]) for row in rows]
 
     async def get_recent_swaps(self, limit: int = 10) -> list[AtomicSwap]:
         """Get recent swaps."""
-        async with self.async_session() as session:
-            result = await session.execute(
-                text(
-                    "SELECT full_swap_json FROM atomic_swaps ORDER BY detected_at DESC LIMIT :limit"
-                ),
-                {"limit": limit},
-            )
-            return [AtomicSwap.model_validate_json(row[0]) for row in result]
+        rows = await self._fetch_json(_SELECT_RECENT, {"limit": limit})
+        return _decode_swaps(rows)
 
     async def update_tweet_id(self, swap_id: str, tweet_id: str):
-        """Update the tweet ID for a swap."""
-        async with self.async_session() as session:
-            await session.execute(
-                text(
-                    "UPDATE atomic_swaps SET notification_sent = :tweet_id WHERE swap_id = :swap_id"
-                ),
-                 {"tweet_id": tweet_id, "swap_id": swap_id},
+        """Record the notification (normally the tweet ID) sent for a swap."""
+        async with self.engine.begin() as conn:
+            result = await conn.execute(
+                _UPDATE_TWEET_ID, {"tweet_id": tweet_id, "swap_id": swap_id}
             )
-            await session.commit()
+            # RETURNING hands back the lock txid for the by-lock cache entry
+            row = result.first()
+        if row is not None:
+            self._evict_swap(swap_id, row[0])
@@ -0,0 +1,12 @@
+"""Event loop setup shared by the bot's entry points."""
+
+import asyncio
+
+
+def install_uvloop():
+    """Use uvloop's event loop for asyncio.run() when it's available."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
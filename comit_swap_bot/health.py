@@ -1,13 +1,24 @@
 """Simple health check HTTP server."""
 
-from datetime import datetime
+import asyncio
+from datetime import datetime, timezone
 from typing import Any
 
+import orjson
 import structlog
 from aiohttp import web
 
 logger = structlog.get_logger()
 
+# The timestamp in response bodies is refreshed on this interval rather than
+# formatted per request
+REFRESH_INTERVAL = 0.1
+
+# The health body is spliced together from pre-encoded fragments around the
+# timestamp
+_HEALTH_PREFIX = b'{"status":"healthy","timestamp":"'
+_HEALTH_SUFFIX = b'","service":"comit-swap-bot"}'
+
 
 class HealthServer:
     """Simple HTTP server for health checks."""
@@ -16,50 +27,79 @@ class HealthServer:
         """Initialize health server."""
         self.port = port
         self.app = web.Application()
-        self.app.router.add_get("/health", self.health_handler)
-        self.app.router.add_get("/status", self.status_handler)
+        self.app.add_routes(
+            [
+                web.get("/health", self.health_handler),
+                web.get("/status", self.status_handler),
+            ]
+        )
         self.runner = None
         self.site = None
         self._status_data: dict[str, Any] = {}
 
-    async def health_handler(self, request):
-        """Handle health check requests."""
-        return web.json_response(
-            {
-                "status": "healthy",
-                "timestamp": datetime.utcnow().isoformat(),
-                "service": "comit-swap-bot",
-            }
-        )
+        self._headers = {
+            "Content-Type": "application/json",
+            "Cache-Control": "no-store",
+        }
+        self._refresh_handle: asyncio.TimerHandle | None = None
+        self._health_body = b""
+        self._status_body = b""
+        self._render()
 
-    async def status_handler(self, request):
-        """Handle detailed status requests."""
-        return web.json_response(
+    def _render(self):
+        """Rebuild both response bodies around the current timestamp."""
+        now = datetime.now(timezone.utc).isoformat()
+        self._health_body = _HEALTH_PREFIX + now.encode() + _HEALTH_SUFFIX
+        # Merged into one dict so a status field named like a fixed key
+        # replaces it instead of repeating it
+        self._status_body = orjson.dumps(
             {
                 "status": "running",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": now,
                 "service": "comit-swap-bot",
                 **self._status_data,
-            }
+            },
+            default=str,
         )
 
+    def _refresh(self):
+        """Refresh the timestamp and schedule the next tick."""
+        self._render()
+        loop = asyncio.get_running_loop()
+        self._refresh_handle = loop.call_later(REFRESH_INTERVAL, self._refresh)
+
+    async def health_handler(self, request):
+        """Handle health check requests."""
+        return web.Response(body=self._health_body, headers=self._headers)
+
+    async def status_handler(self, request):
+        """Handle detailed status requests."""
+        return web.Response(body=self._status_body, headers=self._headers)
+
     def update_status(self, **kwargs):
         """Update status data."""
         self._status_data.update(kwargs)
+        self._render()
 
     async def start(self):
         """Start the health server."""
         try:
-            self.runner = web.AppRunner(self.app)
+            self.runner = web.AppRunner(
+                self.app, handle_signals=False, access_log=None, keepalive_timeout=75
+            )
             await self.runner.setup()
-            self.site = web.TCPSite(self.runner, "0.0.0.0", self.port)
+            self.site = web.TCPSite(self.runner, "0.0.0.0", self.port, backlog=512)
             await self.site.start()
+            self._refresh()
             logger.info("Health server started", port=self.port)
         except Exception as e:
             logger.error("Failed to start health server", error=str(e))
 
     async def stop(self):
         """Stop the health server."""
+        if self._refresh_handle:
+            self._refresh_handle.cancel()
+            self._refresh_handle = None
         if self.site:
             await self.site.stop()
         if self.runner:
@@ -10,7 +10,7 @@ from datetime import datetime
 from decimal import Decimal
 from enum import Enum
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_serializer
 
 
 class SwapState(str, Enum):
@@ -38,6 +38,8 @@ class HTLCScript(BaseModel):
     recipient/sender pubkey hashes, and a timelock value.
     """
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     recipient_pubkey_hash: str = Field(description="Hash160 of recipient's public key")
     sender_pubkey_hash: str = Field(description="Hash160 of sender's public key")
     secret_hash: str = Field(description="SHA256 hash of the secret")
@@ -47,6 +49,9 @@ class HTLCScript(BaseModel):
 class Transaction(BaseModel):
     """Basic Bitcoin transaction representation."""
 
+    # Transactions never change once parsed; HTLCTransaction inherits this
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     txid: str = Field(description="Transaction ID (double-SHA256 hash)")
     version: int = Field(default=2, description="Transaction version number")
     locktime: int = Field(
@@ -81,6 +86,10 @@ class HTLCTransaction(Transaction):
     )
 
 
+# Stored in notification_sent when notifiers delivered but nothing was tweeted
+NOTIFIED_WITHOUT_TWEET = "notified"
+
+
 class AtomicSwap(BaseModel):
     """
     Complete atomic swap tracking record.
@@ -90,6 +99,10 @@ class AtomicSwap(BaseModel):
     the lock transaction hash for consistent identification.
     """
 
+    # Left mutable: state, pricing and notification fields are updated in
+    # place as the swap progresses
+    model_config = ConfigDict(extra="forbid")
+
     swap_id: str = Field(description="Unique identifier derived from lock TXID")
     lock_transaction: HTLCTransaction = Field(
         description="Initial HTLC setup transaction"
@@ -115,16 +128,19 @@ class AtomicSwap(BaseModel):
 
     # Notification tracking
     notification_sent: str | None = Field(
-        None, description="Twitter tweet ID if posted"
+        None,
+        description="Twitter tweet ID if posted, NOTIFIED_WITHOUT_TWEET if only "
+        "other notifiers were used",
     )
 
-    class Config:
-        """Pydantic model configuration."""
+    @field_serializer("detected_at", "last_updated", when_used="json")
+    def _serialize_timestamp(self, dt: datetime) -> str:
+        """Keep isoformat() output ("+00:00") rather than pydantic's "Z"."""
+        return dt.isoformat()
 
-        json_encoders = {
-            datetime: lambda dt: dt.isoformat(),
-            Decimal: lambda d: str(d),
-        }
+    def to_json(self) -> str:
+        """Serialize for storage, omitting fields that are still None."""
+        return self.model_dump_json(by_alias=True, exclude_none=True)
 
 
 class SwapAlert(BaseModel):
@@ -149,3 +165,10 @@ class SwapNotification(BaseModel):
 
     swap: AtomicSwap = Field(description="The detected atomic swap")
     message: str = Field(description="Notification message")
+    tweet_id: str | None = Field(None, description="Set once the swap is tweeted")
+
+
+# Built once at import and shared, so hot paths never rebuild a validator;
+# the list adapter decodes a whole JSON array of swaps in one call
+ATOMIC_SWAP_ADAPTER = TypeAdapter(AtomicSwap)
+ATOMIC_SWAP_LIST_ADAPTER = TypeAdapter(list[AtomicSwap])
@@ -1,17 +1,83 @@
 """Notification system for detected swaps."""
 
 import asyncio
+import time
 from abc import ABC, abstractmethod
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
 
+import aiohttp
 import structlog
-import tweepy
 from apprise import Apprise
+from tweepy.asynchronous import AsyncClient
+from tweepy.errors import TooManyRequests
 
+from .attribution import attribution
 from .config import config
-from .models import AtomicSwap, SwapNotification
+from .models import NOTIFIED_WITHOUT_TWEET, AtomicSwap, SwapNotification
 
 logger = structlog.get_logger()
 
+# Fixed parts of the notification text, built once at import; config is
+# frozen so the attribution line can't change underneath us
+_HEADER = "🔄 New BTC⇆XMR Atomic Swap!\n\n"
+_HASHTAGS = "\n\n#AtomicSwap #Bitcoin #Monero"
+_ATTRIB = attribution.format_attribution_for_twitter()
+
+TWEET_MAX_LEN = 280
+
+# Tweets allowed in flight at once, so a burst of swaps queues here instead
+# of running straight into the API rate limit
+TWEET_CONCURRENCY = 2
+
+# Sends per swap before giving up on notifiers that keep failing, so one
+# broken channel can't hold a swap pending (and resent) forever
+MAX_NOTIFY_ATTEMPTS = 5
+
+# How long to hold off tweeting after a 429 that carries no reset time; the
+# Twitter rate-limit window is 15 minutes
+RATE_LIMIT_BACKOFF = 15 * 60
+
+
+def _format_swap_message(swap: AtomicSwap, txid_len: int = 16) -> str:
+    """Format a swap into a notification message with proper attribution."""
+    if swap.xmr_amount and swap.btc_xmr_rate:
+        # Add CoinGecko attribution when price data is included
+        price = (
+            f"\n   ≈ {swap.xmr_amount:.4f} XMR"
+            f"\n📊 Rate: 1 BTC = {swap.btc_xmr_rate:.4f} XMR"
+            f"\n{_ATTRIB}"
+        )
+    else:
+        price = ""
+
+    return (
+        f"{_HEADER}"
+        f"📦 TX: {swap.lock_transaction.txid[:txid_len]}...\n"
+        f"💰 Amount: {swap.btc_amount:.8f} BTC"
+        f"{price}\n"
+        f"🕐 {swap.detected_at:%Y-%m-%d %H:%M:%S} UTC"
+        f"{_HASHTAGS}"
+    )
+
+
+def _worst_case_len(txid_len: int) -> int:
+    """Length of the longest message we expect to format."""
+    # Amounts are bounded by the BTC supply cap and a generous XMR ceiling
+    swap = SimpleNamespace(
+        lock_transaction=SimpleNamespace(txid="f" * 64),
+        btc_amount=Decimal("21000000"),
+        xmr_amount=Decimal("9999999999"),
+        btc_xmr_rate=Decimal("9999999999"),
+        detected_at=datetime(2000, 1, 1),
+    )
+    return len(_format_swap_message(swap, txid_len))
+
+
+# Only the txid prefix is worth trimming, so decide once whether it must be
+_TXID_PREFIX_LEN = 12 if _worst_case_len(16) > TWEET_MAX_LEN else 16
+
 
 class Notifier(ABC):
     """Base class for swap notifiers."""
@@ -21,30 +87,24 @@ class Notifier(ABC):
         """Send a notification about a detected swap."""
         pass
 
+    def available(self) -> bool:
+        """Whether the notifier can send right now."""
+        return True
+
+    async def close(self):
+        """Release any connections held by the notifier."""
+        # Nothing to release unless a notifier keeps its own session
+        return
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
     def format_swap_message(self, swap: AtomicSwap) -> str:
         """Format a swap into a notification message with proper attribution."""
-        message_parts = [
-            "🔄 New BTC⇆XMR Atomic Swap!",
-            "",
-            f"📦 TX: {swap.lock_transaction.txid[:16]}...",
-            f"💰 Amount: {swap.btc_amount:.8f} BTC",
-        ]
-
-        if swap.xmr_amount and swap.btc_xmr_rate:
-            message_parts.append(f"   ≈ {swap.xmr_amount:.4f} XMR")
-            message_parts.append(f"📊 Rate: 1 BTC = {swap.btc_xmr_rate:.4f} XMR")
-            # Add CoinGecko attribution when price data is included
-            message_parts.append(f"💱 {config.coingecko_attribution_text}")
-
-        message_parts.extend(
-            [
-                f"🕐 {swap.detected_at.strftime('%Y-%m-%d %H:%M:%S')} UTC",
-                "",
-                " ".join(f"#{tag}" for tag in ["AtomicSwap", "Bitcoin", "Monero"]),
-            ]
-        )
-
-        return "\n".join(message_parts)
+        return _format_swap_message(swap, _TXID_PREFIX_LEN)
 
 
 class TwitterNotifier(Notifier):
@@ -62,35 +122,39 @@ class TwitterNotifier(Notifier):
         ):
             raise ValueError("Twitter credentials not configured")
 
-        # Initialize v2 client for tweeting
-        self.client = tweepy.Client(
+        # Initialize v2 client for tweeting; aiohttp-based so tweets don't
+        # need a worker thread. A 429 isn't waited out inside the call, which
+        # could hold the sweep for 15 minutes; the swap is retried instead.
+        self.client = AsyncClient(
             consumer_key=config.twitter_api_key,
             consumer_secret=config.twitter_api_secret,
             access_token=config.twitter_access_token,
             access_token_secret=config.twitter_access_token_secret,
         )
+        self._limit = asyncio.Semaphore(TWEET_CONCURRENCY)
+        # Wall-clock time the current rate-limit window resets
+        self._rate_limited_until = 0.0
+
+    def available(self) -> bool:
+        """Whether the last rate-limit window we hit has reset."""
+        return time.time() >= self._rate_limited_until
 
     async def notify(self, notification: SwapNotification) -> bool:
         """Tweet about a detected swap."""
-        try:
-            # Format message
-            message = self.format_swap_message(notification.swap)
-
-            # Ensure message fits Twitter's character limit
-            if len(message) > 280:
-                # Truncate transaction ID if needed
-                message = message.replace(
-                    notification.swap.lock_transaction.txid[:16],
-                    notification.swap.lock_transaction.txid[:12],
-                )
+        if not self.available():
+            return False
 
-            # Tweet in a thread-safe way
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None, self.client.create_tweet, message
-            )
+        try:
+            async with self._limit:
+                # tweepy opens (and tears down) a new aiohttp session per
+                # request unless one is set; share one across tweets. Made
+                # here because a session has to be created inside the loop.
+                if self.client.session is None:
+                    self.client.session = aiohttp.ClientSession()
+                response = await self.client.create_tweet(text=notification.message)
 
             tweet_id = response.data["id"]
+            notification.tweet_id = tweet_id
             logger.info(
                 "Tweeted swap notification",
                 swap_id=notification.swap.swap_id,
@@ -99,12 +163,30 @@ class TwitterNotifier(Notifier):
 
             return True
 
+        except TooManyRequests as e:
+            reset = e.response.headers.get("x-rate-limit-reset")
+            self._rate_limited_until = (
+                float(reset) if reset else time.time() + RATE_LIMIT_BACKOFF
+            )
+            logger.warning(
+                "Tweet rate limited",
+                swap_id=notification.swap.swap_id,
+                retry_after=self._rate_limited_until - time.time(),
+            )
+            return False
+
         except Exception as e:
             logger.error(
                 "Failed to tweet", swap_id=notification.swap.swap_id, error=str(e)
             )
             return False
 
+    async def close(self):
+        """Close the shared Twitter API session."""
+        if self.client.session is not None:
+            await self.client.session.close()
+            self.client.session = None
+
 
 class AppriseNotifier(Notifier):
     """Multi-platform notification handler using Apprise."""
@@ -122,15 +204,15 @@ class AppriseNotifier(Notifier):
 
     async def notify(self, notification: SwapNotification) -> bool:
         """Send notification via Apprise."""
+        # Nothing to deliver to, which isn't worth retrying
+        if not self.apprise.urls():
+            return True
+
         try:
-            message = self.format_swap_message(notification.swap)
+            message = notification.message
             title = "New BTC⇆XMR Atomic Swap Detected!"
 
-            # Run in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, self.apprise.notify, message, title
-            )
+            result = await self.apprise.async_notify(message, title)
 
             if result:
                 logger.info(
@@ -141,7 +223,8 @@ class AppriseNotifier(Notifier):
                     "Apprise notification failed", swap_id=notification.swap.swap_id
                 )
 
-            return result
+            # Newer Apprise returns an AppriseResult rather than a bool
+            return bool(result)
 
         except Exception as e:
             logger.error(
@@ -156,7 +239,7 @@ class ConsoleNotifier(Notifier):
     async def notify(self, notification: SwapNotification) -> bool:
         """Print notification to console."""
         print("\n" + "=" * 60)
-        print(self.format_swap_message(notification.swap))
+        print(notification.message)
         print("=" * 60 + "\n")
         return True
 
@@ -168,6 +251,11 @@ class NotificationManager:
         """Initialize notification manager."""
         self.notifiers: list[Notifier] = []
 
+        # Per swap still pending: the notifiers that already delivered it,
+        # and how many sends have been tried
+        self._delivered: dict[str, set[Notifier]] = {}
+        self._attempts: dict[str, int] = {}
+
         # Add configured notifiers
         if config.enable_twitter:
             try:
@@ -181,22 +269,68 @@ class NotificationManager:
         # Always add console notifier for visibility
         self.notifiers.append(ConsoleNotifier())
 
-    async def notify_swap(self, swap: AtomicSwap):
-        """Notify all configured notifiers about a swap."""
+    async def notify_swap(self, swap: AtomicSwap) -> str | None:
+        """
+        Notify all configured notifiers about a swap.
+
+        Returns what to record as the swap's notification_sent: the tweet ID
+        if it was tweeted, NOTIFIED_WITHOUT_TWEET if every notifier delivered
+        without one, or None if it should be retried. A posted tweet always
+        counts, since resending would only duplicate it. Retries only go to
+        the notifiers that haven't delivered yet, and after
+        MAX_NOTIFY_ATTEMPTS failed sends the failing ones are given up on.
+        """
+        swap_id = swap.swap_id
+        delivered = self._delivered.setdefault(swap_id, set())
+        # Notifiers waiting out a rate limit sit this pass out
+        pending = [n for n in self.notifiers if n not in delivered and n.available()]
+
+        # Format once and share the text across every notifier
         notification = SwapNotification(
-            swap=swap, message=f"Detected atomic swap: {swap.swap_id}"
+            swap=swap, message=_format_swap_message(swap, _TXID_PREFIX_LEN)
         )
 
         # Send notifications concurrently
-        tasks = [notifier.notify(notification) for notifier in self.notifiers]
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        success_count = sum(1 for r in results if isinstance(r, bool) and r)
+        results = await asyncio.gather(
+            *(notifier.notify(notification) for notifier in pending),
+            return_exceptions=True,
+        )
+        delivered.update(
+            notifier
+            for notifier, result in zip(pending, results, strict=True)
+            if result is True
+        )
 
         logger.info(
             "Sent notifications",
-            swap_id=swap.swap_id,
-            success_count=success_count,
+            swap_id=swap_id,
+            success_count=len(delivered),
             total_count=len(self.notifiers),
         )
+
+        # Only sends that actually failed count towards giving up
+        attempts = self._attempts.get(swap_id, 0)
+        if not all(result is True for result in results):
+            attempts = self._attempts[swap_id] = attempts + 1
+        if notification.tweet_id:
+            result = notification.tweet_id
+        elif len(delivered) == len(self.notifiers):
+            result = NOTIFIED_WITHOUT_TWEET
+        elif attempts >= MAX_NOTIFY_ATTEMPTS:
+            logger.error(
+                "Giving up on failing notifiers",
+                swap_id=swap_id,
+                attempts=attempts,
+                failed=[type(n).__name__ for n in self.notifiers if n not in delivered],
+            )
+            result = NOTIFIED_WITHOUT_TWEET
+        else:
+            return None
+
+        del self._delivered[swap_id]
+        self._attempts.pop(swap_id, None)
+        return result
+
+    async def close(self):
+        """Close every notifier."""
+        await asyncio.gather(*(notifier.close() for notifier in self.notifiers))
@@ -8,7 +8,10 @@ to unhandled websocket disconnections.
 """
 
 import asyncio
+from collections import deque
+from collections.abc import Awaitable
 from datetime import datetime, timezone
+from typing import TypeVar
 
 import structlog
 
@@ -21,6 +24,12 @@ from .swap_watcher import SwapWatcher
 
 logger = structlog.get_logger()
 
+T = TypeVar("T")
+
+# Cap on pending swaps enriched and notified at once, to stay inside the
+# CoinGecko rate limit
+PENDING_SWAP_CONCURRENCY = 8
+
 
 class SwapOrchestrator:
     """
@@ -61,6 +70,8 @@ class SwapOrchestrator:
         self.total_swaps_processed = 0
         self.last_price_update = None
 
+        self._pending_limit = asyncio.Semaphore(PENDING_SWAP_CONCURRENCY)
+
     async def start(self):
         """
         Fire up the whole operation.
@@ -76,7 +87,7 @@ class SwapOrchestrator:
         if self.health_server:
             await self.health_server.start()
             self.health_server.update_status(
-                started_at=datetime.utcnow().isoformat(),
+                started_at=datetime.now(timezone.utc).isoformat(),
                 watcher_running=True,
                 swaps_processed=self.total_swaps_processed,
             )
@@ -85,9 +96,6 @@ class SwapOrchestrator:
         self.background_tasks = [
             asyncio.create_task(self.mempool_watcher.start(), name="mempool-watcher"),
             asyncio.create_task(self._handle_pending_swaps(), name="swap-processor"),
-            asyncio.create_task(
-                self._monitor_swap_lifecycle(), name="lifecycle-monitor"
-            ),
         ]
 
         # Wait for any task to complete (usually means an error occurred)
@@ -138,17 +146,7 @@ class SwapOrchestrator:
         """
         while self.is_running:
             try:
-                # Find swaps missing price data or notifications
-                incomplete_swaps = await self.swap_db.get_pending_swaps()
-
-                for pending_swap in incomplete_swaps:
-                    # Enrich with current BTC/XMR rate if needed
-                    if not pending_swap.amount_xmr:
-                        await self._enrich_with_price_data(pending_swap)
-
-                    # Send notification if we haven't already
-                    if not pending_swap.tweet_id and pending_swap.amount_xmr:
-                        await self.notification_mgr.notify_swap(pending_swap)
+                await self._sweep_pending_swaps()
 
                 # Check again in 30 seconds - not too aggressive
                 await asyncio.sleep(30)
@@ -158,51 +156,111 @@ class SwapOrchestrator:
                 # Back off a bit more on errors
                 await asyncio.sleep(60)
 
-    async def _monitor_swap_lifecycle(self):
-        """
-        Watch for redemptions and refunds of tracked swaps.
+    async def _sweep_pending_swaps(self):
+        """Price and notify every pending swap once."""
+        # Find swaps missing price data or notifications. Only the keys come
+        # back; full records are loaded for unfinished ones.
+        pending_keys = await self.swap_db.get_pending_swap_keys()
+        swap_ids = [swap_id for swap_id, _lock_txid in pending_keys]
+
+        # Each swap waits on its own price and notification round trips, so
+        # work through the backlog concurrently
+        loaded = await self._gather_pending(
+            {swap_id: self._load_and_price(swap_id) for swap_id in swap_ids}
+        )
 
-        The SwapWatcher handles initial detection, but this monitors
-        the full lifecycle of each swap to completion.
+        # Everything priced this pass goes out in one transaction, before any
+        # notification: those are slow network round trips, and only the
+        # price fields are written so a redeem or refund saved by the watcher
+        # meanwhile stays put
+        await self.swap_db.save_swap_prices([swap for swap, fresh in loaded if fresh])
+
+        await self._gather_pending(
+            {swap.swap_id: self._notify_one(swap) for swap, _fresh in loaded}
+        )
+
+    async def _gather_pending(self, jobs: dict[str, Awaitable[T]]) -> list[T]:
+        """Run per-swap jobs concurrently, logging failures; returns results."""
+        results = await asyncio.gather(*jobs.values(), return_exceptions=True)
+        completed = []
+        for swap_id, result in zip(jobs, results, strict=True):
+            if isinstance(result, Exception):
+                logger.error(
+                    "Failed to process pending swap",
+                    swap_id=swap_id,
+                    error=str(result),
+                )
+            elif result is not None:
+                completed.append(result)
+        return completed
+
+    async def _load_and_price(self, swap_id: str) -> tuple[AtomicSwap, bool] | None:
         """
-        while self.is_running:
-            try:
-                # The swap watcher already monitors for updates via websocket
-                # This is mostly a placeholder for additional lifecycle logic
-                await asyncio.sleep(60)
+        Load one pending swap, enriching it with price data if it has none.
 
-            except Exception as e:
-                logger.error("🔥 Error in lifecycle monitoring", error=str(e))
-                await asyncio.sleep(60)
+        Returns the swap and whether it was priced just now, or None if it
+        still has no pricing.
+        """
+        async with self._pending_limit:
+            pending_swap = await self.swap_db.get_swap(swap_id)
+            if pending_swap is None:
+                return None
+            if pending_swap.xmr_amount:
+                return pending_swap, False
+
+            # Enrich with current BTC/XMR rate
+            enriched = await self._enrich_with_price_data(pending_swap)
+            return (enriched, True) if enriched is not None else None
+
+    async def _notify_one(self, swap: AtomicSwap):
+        """
+        Send the notification for a priced swap if we haven't already.
 
-    async def _enrich_with_price_data(self, incomplete_swap: AtomicSwap):
+        The result is recorded in the database, which is what takes the swap
+        out of later sweeps; a failed notification is retried next pass.
+        """
+        if swap.notification_sent:
+            return
+        async with self._pending_limit:
+            sent = await self.notification_mgr.notify_swap(swap)
+        if sent is None:
+            logger.warning("Notification failed, will retry", swap_id=swap.swap_id)
+            return
+        await self.swap_db.update_tweet_id(swap.swap_id, sent)
+
+    async def _enrich_with_price_data(
+        self, incomplete_swap: AtomicSwap
+    ) -> AtomicSwap | None:
         """
         Add current market pricing to a detected swap.
 
+        The caller is responsible for saving the updated swap, so a pass
+        over many swaps can write them in one batch.
+
         Args:
             incomplete_swap: Swap record missing XMR amount calculation
+
+        Returns:
+            The updated swap, or None if no rate was available
         """
         try:
             # Get latest BTC/XMR rate from price service
             current_rate = await self.price_service.get_btc_to_xmr_rate()
             if current_rate:
+                # One clock read stamps both the swap and our own stats
+                now = datetime.now(timezone.utc)
                 incomplete_swap.btc_xmr_rate = current_rate
-                incomplete_swap.xmr_amount = (
-                    await self.price_service.convert_btc_to_xmr(
-                        incomplete_swap.btc_amount
-                    )
-                )
-                incomplete_swap.last_updated = datetime.now(timezone.utc)
-                await self.swap_db.save_swap(incomplete_swap)
-
-                self.last_price_update = datetime.now(timezone.utc)
+                incomplete_swap.xmr_amount = incomplete_swap.btc_amount * current_rate
+                incomplete_swap.last_updated = now
+                self.last_price_update = now
 
                 logger.info(
                     "💱 Added pricing data to swap",
                     swap_id=incomplete_swap.swap_id,
-                    btc_xmr_rate=float(current_rate),
-                    xmr_amount=float(incomplete_swap.xmr_amount),
+                    btc_xmr_rate=current_rate,
+                    xmr_amount=incomplete_swap.xmr_amount,
                 )
+                return incomplete_swap
 
         except Exception as e:
             logger.error(
@@ -210,8 +268,11 @@ class SwapOrchestrator:
                 swap_id=incomplete_swap.swap_id,
                 error=str(e),
             )
+        return None
 
-    async def run_historical_backfill(self, start_height: int, end_height: int):
+    async def run_historical_backfill(
+        self, start_height: int, end_height: int, concurrency: int = 16
+    ):
         """
         Scan historical blocks for missed atomic swaps.
 
@@ -222,6 +283,7 @@ class SwapOrchestrator:
         Args:
             start_height: Bitcoin block height to start scanning from
             end_height: Bitcoin block height to stop scanning at
+            concurrency: How many blocks to fetch from the API at once
         """
         logger.info(
             "📚 Starting historical backfill scan",
@@ -231,8 +293,7 @@ class SwapOrchestrator:
         )
 
         try:
-            # Let the swap watcher handle the actual scanning
-            await self.mempool_watcher.backfill(start_height, end_height)
+            await self._run_backfill_pipeline(start_height, end_height, concurrency)
 
             # Process any newly found swaps
             await self._handle_pending_swaps()
@@ -244,3 +305,68 @@ class SwapOrchestrator:
         except Exception as e:
             logger.error("💥 Backfill scan failed", error=str(e))
             raise
+
+    async def _run_backfill_pipeline(
+        self, start_height: int, end_height: int, concurrency: int
+    ):
+        """
+        Fetch blocks concurrently while a single writer batches the inserts.
+
+        Up to `concurrency` block fetches are in flight at once, but blocks
+        are scanned strictly in height order so a spend is always seen after
+        the lock it spends. Detected swaps go through a queue to one writer
+        coroutine that saves them in batches.
+        """
+        watcher = self.mempool_watcher
+        queue: asyncio.Queue[AtomicSwap | None] = asyncio.Queue(maxsize=64)
+        writer = asyncio.create_task(self._backfill_writer(queue))
+        heights = iter(range(start_height, end_height + 1))
+        window: deque[tuple[int, asyncio.Task]] = deque()
+
+        def schedule_next_fetch():
+            height = next(heights, None)
+            if height is not None:
+                window.append(
+                    (height, asyncio.create_task(watcher.fetch_block(height)))
+                )
+
+        async def enqueue(item: AtomicSwap | None):
+            # Race the put against the writer: if the writer dies while the
+            # queue is full, nothing would ever make room
+            put = asyncio.ensure_future(queue.put(item))
+            await asyncio.wait({put, writer}, return_when=asyncio.FIRST_COMPLETED)
+            if not put.done():
+                put.cancel()
+                # Surfaces the writer's exception
+                writer.result()
+
+        watcher.begin_backfill()
+        try:
+            for _ in range(max(concurrency, 1)):
+                schedule_next_fetch()
+
+            while window and not writer.done():
+                height, fetch = window.popleft()
+                schedule_next_fetch()
+                for swap in await watcher.scan_block(height, await fetch):
+                    await enqueue(swap)
+        finally:
+            for _, fetch in window:
+                fetch.cancel()
+            try:
+                if not writer.done():
+                    await enqueue(None)
+                # Re-raises if the writer failed
+                await writer
+            finally:
+                watcher.end_backfill()
+
+    async def _backfill_writer(self, queue: asyncio.Queue):
+        """Drain backfilled swaps from the queue and save them in batches."""
+        batch: list[AtomicSwap] = []
+        while (swap := await queue.get()) is not None:
+            batch.append(swap)
+            if len(batch) >= self.mempool_watcher.BACKFILL_BATCH_SIZE:
+                await self.swap_db.save_swaps(batch)
+                batch = []
+        await self.swap_db.save_swaps(batch)
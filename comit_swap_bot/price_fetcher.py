@@ -1,16 +1,35 @@
 """Price fetching utilities for BTC/XMR conversion."""
 
+import asyncio
+import json
+import sqlite3
+import time
+from collections.abc import Awaitable, Callable
 from datetime import datetime
 from decimal import Decimal
+from functools import partial
+from typing import Any, TypeVar
 
+import diskcache
 import httpx
 import structlog
-from cachetools import TTLCache
 
 from .config import config
 
 logger = structlog.get_logger()
 
+# Seconds a fetched rate is reused, to respect rate limits
+RATE_TTL = 60.0
+
+T = TypeVar("T")
+
+
+def _loads(body: bytes) -> Any:
+    """Decode a CoinGecko response with every number parsed as a Decimal."""
+    # Parsing the number tokens directly skips the float round trip; ints
+    # too, so a rate from two whole-dollar prices stays a Decimal
+    return json.loads(body, parse_float=Decimal, parse_int=Decimal)
+
 
 class PriceFetcher:
     """
@@ -22,7 +41,19 @@ class PriceFetcher:
 
     def __init__(self):
         """Initialize the price fetcher with CoinGecko API client."""
+        # One long-lived HTTP/2 connection pool so the price loop reuses TLS
+        # sessions; limits and http2 live on the transport since it's custom
         self.client = httpx.AsyncClient(
+            base_url=config.coingecko_api_url,
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=httpx.Limits(
+                    max_keepalive_connections=4,
+                    max_connections=8,
+                    keepalive_expiry=300.0,
+                ),
+                retries=2,
+            ),
             timeout=10.0,
             headers={
                 "Accept": "application/json",
@@ -32,34 +63,112 @@ class PriceFetcher:
         if config.coingecko_api_key:
             self.client.headers["x-cg-pro-api-key"] = config.coingecko_api_key
 
-        # Cache prices for 60 seconds to respect rate limits
-        self._price_cache: TTLCache = TTLCache(maxsize=10, ttl=60)
+        # The current BTC->XMR rate and its reciprocal are the only cached
+        # values, kept with their expiry so conversions never re-divide
+        self._rate_and_reciprocal: tuple[Decimal, Decimal] | None = None
+        self._rate_expiry = 0.0
+
+        # Optional on-disk copy of fetched rates, shared across runs so
+        # repeated backfills don't go back to CoinGecko. It does blocking
+        # SQLite I/O, so it's opened on first use and only ever touched from
+        # a worker thread.
+        self._disk: diskcache.Cache | None = None
+        self._disk_checked = not config.enable_price_cache
+        self._disk_lock = asyncio.Lock()
+        # Historical rates already looked up this run, in front of the disk
+        self._historical_rates: dict[str, Decimal] = {}
+
+        # Requests currently on the wire, so concurrent misses share one call
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def _single_flight(
+        self, key: str, fetch: Callable[[], Awaitable[T | None]]
+    ) -> T | None:
+        """Run fetch once per key, handing its result to concurrent callers."""
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fetch()
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+            # Waiters fall back to "no rate" if the leading call was cancelled
+            if not future.done():
+                future.set_result(None)
+
+    async def _get_disk(self) -> diskcache.Cache | None:
+        """The disk cache, opened on first use; None if disabled or unusable."""
+        if self._disk_checked:
+            return self._disk
+        async with self._disk_lock:
+            if not self._disk_checked:
+                try:
+                    self._disk = await asyncio.to_thread(
+                        diskcache.Cache, config.price_cache_dir
+                    )
+                except (OSError, sqlite3.Error) as e:
+                    logger.warning(
+                        "Price cache unavailable, continuing without it",
+                        path=config.price_cache_dir,
+                        error=str(e),
+                    )
+                self._disk_checked = True
+        return self._disk
+
+    @property
+    def rate(self) -> Decimal | None:
+        """The cached BTC to XMR rate, or None if it is missing or stale."""
+        if time.monotonic() < self._rate_expiry:
+            return self._rate_and_reciprocal[0]
+        return None
+
+    async def _get_rates(self) -> tuple[Decimal, Decimal] | None:
+        """Get the current BTC->XMR rate and its reciprocal."""
+        # Check cache
+        if time.monotonic() < self._rate_expiry:
+            return self._rate_and_reciprocal
+
+        return await self._single_flight("btc_xmr_rate", self._fetch_btc_to_xmr_rate)
 
     async def get_btc_to_xmr_rate(self) -> Decimal | None:
         """Get the current BTC to XMR exchange rate."""
-        cache_key = "btc_xmr_rate"
+        rates = await self._get_rates()
+        return None if rates is None else rates[0]
 
-        # Check cache
-        if cache_key in self._price_cache:
-            return self._price_cache[cache_key]
+    async def _fetch_btc_to_xmr_rate(self) -> tuple[Decimal, Decimal] | None:
+        """Fetch the current rate and its reciprocal from CoinGecko, caching both."""
+        # Live rates are shared on disk per wall-clock minute
+        minute, offset = divmod(time.time(), RATE_TTL)
+        disk_key = ("live", int(minute))
+        disk = await self._get_disk()
+        if disk is not None:
+            rates = await asyncio.to_thread(disk.get, disk_key)
+            if rates is not None:
+                self._rate_and_reciprocal = rates
+                self._rate_expiry = time.monotonic() + RATE_TTL - offset
+                return rates
 
         try:
             # Fetch both BTC and XMR prices in USD
-            url = f"{config.coingecko_api_url}/simple/price"
             params = {"ids": "bitcoin,monero", "vs_currencies": "usd", "precision": 18}
 
-            response = await self.client.get(url, params=params)
+            response = await self.client.get("/simple/price", params=params)
             response.raise_for_status()
-            data = response.json()
+            data = _loads(response.content)
 
-            btc_usd = Decimal(str(data["bitcoin"]["usd"]))
-            xmr_usd = Decimal(str(data["monero"]["usd"]))
+            btc_usd = data["bitcoin"]["usd"]
+            xmr_usd = data["monero"]["usd"]
 
             # Calculate BTC to XMR rate
             rate = btc_usd / xmr_usd
 
             # Cache the result
-            self._price_cache[cache_key] = rate
+            self._rate_and_reciprocal = (rate, xmr_usd / btc_usd)
+            self._rate_expiry = time.monotonic() + RATE_TTL
 
             logger.info(
                 "📊 Fetched exchange rate from CoinGecko",
@@ -69,7 +178,15 @@ class PriceFetcher:
                 attribution="Price data by CoinGecko",
             )
 
-            return rate
+            if disk is not None:
+                await asyncio.to_thread(
+                    disk.set,
+                    disk_key,
+                    self._rate_and_reciprocal,
+                    expire=RATE_TTL,
+                )
+
+            return self._rate_and_reciprocal
 
         except Exception as e:
             logger.error("Failed to fetch price", error=str(e))
@@ -78,37 +195,64 @@ class PriceFetcher:
     async def convert_btc_to_xmr(self, btc_amount: Decimal) -> Decimal | None:
         """Convert BTC amount to XMR using current market rate."""
         rate = await self.get_btc_to_xmr_rate()
-        if rate:
-            return btc_amount * rate
-        return None
+        return None if rate is None else btc_amount * rate
+
+    async def convert_xmr_to_btc(self, xmr_amount: Decimal) -> Decimal | None:
+        """Convert XMR amount to BTC using current market rate."""
+        rates = await self._get_rates()
+        return None if rates is None else xmr_amount * rates[1]
 
     async def get_historical_rate(self, timestamp: datetime) -> Decimal | None:
         """Get historical BTC to XMR rate for a specific timestamp."""
-        try:
-            # CoinGecko requires date in dd-mm-yyyy format
-            date_str = timestamp.strftime("%d-%m-%Y")
+        # CoinGecko requires date in dd-mm-yyyy format
+        date_str = timestamp.strftime("%d-%m-%Y")
 
-            url = f"{config.coingecko_api_url}/coins/bitcoin/history"
-            params = {"date": date_str}
+        # Past rates never change, so any cache hit is final
+        rate = self._historical_rates.get(date_str)
+        if rate is not None:
+            return rate
+
+        disk_key = ("hist", date_str, "btc", "xmr")
+        disk = await self._get_disk()
+        if disk is not None:
+            rate = await asyncio.to_thread(disk.get, disk_key)
+            if rate is not None:
+                self._historical_rates[date_str] = rate
+                return rate
 
-            btc_response = await self.client.get(url, params=params)
-            btc_data = btc_response.json()
+        rate = await self._single_flight(
+            f"history:{date_str}", partial(self._fetch_historical_rate, date_str)
+        )
+        if rate is not None:
+            self._historical_rates[date_str] = rate
+            if disk is not None:
+                await asyncio.to_thread(disk.set, disk_key, rate, expire=None)
+        return rate
 
-            url = f"{config.coingecko_api_url}/coins/monero/history"
-            xmr_response = await self.client.get(url, params=params)
-            xmr_data = xmr_response.json()
+    async def _fetch_historical_rate(self, date_str: str) -> Decimal | None:
+        """Fetch the BTC to XMR rate for one dd-mm-yyyy date from CoinGecko."""
+        try:
+            params = {"date": date_str}
+
+            # Monero's history is quoted in BTC too, so one lookup gives the
+            # rate without crossing through USD
+            response = await self.client.get("/coins/monero/history", params=params)
+            response.raise_for_status()
+            data = _loads(response.content)
 
-            btc_usd = Decimal(str(btc_data["market_data"]["current_price"]["usd"]))
-            xmr_usd = Decimal(str(xmr_data["market_data"]["current_price"]["usd"]))
+            xmr_btc = data["market_data"]["current_price"]["btc"]
 
-            return btc_usd / xmr_usd
+            return 1 / xmr_btc
 
         except Exception as e:
             logger.error(
-                "Failed to fetch historical price", timestamp=timestamp, error=str(e)
+                "Failed to fetch historical price", date=date_str, error=str(e)
             )
             return None
 
     async def close(self):
-        """Close the HTTP client."""
+        """Close the HTTP client and the disk cache."""
         await self.client.aclose()
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.close)
+            self._disk = None
@@ -1,16 +1,17 @@
 """Core swap detection engine."""
 
 import asyncio
-import json
-import re
 from datetime import datetime, timezone
 from decimal import Decimal
+from functools import lru_cache
 from typing import Any
 
 import httpx
+import orjson
 import structlog
 import websockets
 from bitcoin.core import COIN
+from websockets.extensions import permessage_deflate
 
 from .config import config
 from .database import SwapDatabase
@@ -19,6 +20,14 @@ from .models import AtomicSwap, HTLCScript, HTLCTransaction, HTLCType, SwapState
 logger = structlog.get_logger()
 
 
+def _btc_to_sats(value: Decimal | float | int) -> int:
+    """Convert a BTC amount from transaction JSON to satoshis exactly."""
+    # Floats go through their shortest repr so 0.1 BTC stays 10_000_000 sats
+    if isinstance(value, float):
+        value = Decimal(repr(value))
+    return int(value * COIN)
+
+
 class SwapWatcher:
     """Watches for atomic swap transactions on the Bitcoin network."""
 
@@ -31,36 +40,68 @@ class SwapWatcher:
     #   OP_DUP OP_HASH160 <sender_pubkey_hash> OP_EQUALVERIFY OP_CHECKSIG
     # OP_ENDIF
 
-    HTLC_PATTERN = re.compile(
-        rb"\x63"  # OP_IF
-        rb"\xa8\x20(.{32})\x88"  # OP_SHA256 <32-byte secret_hash> OP_EQUALVERIFY
-        rb"\x76\xa9\x14(.{20})\x88\xac"  # OP_DUP OP_HASH160 <20-byte recipient_pubkey_hash> OP_EQUALVERIFY OP_CHECKSIG
-        rb"\x67"  # OP_ELSE
-        rb"(.{1,5})\xb1\x75"  # <timelock> OP_CHECKLOCKTIMEVERIFY OP_DROP (1-5 bytes for timelock)
-        rb"\x76\xa9\x14(.{20})\x88\xac"  # OP_DUP OP_HASH160 <20-byte sender_pubkey_hash> OP_EQUALVERIFY OP_CHECKSIG
-        rb"\x68",  # OP_ENDIF
-        re.DOTALL,  # Allow . to match newlines
+    #
+    # The template is rigid, so fields are sliced at fixed offsets. Only the
+    # timelock varies: it is the 1-9 raw bytes between OP_ELSE (offset 61)
+    # and OP_CHECKLOCKTIMEVERIFY, so the script length fixes its width.
+    HTLC_PREFIX = b"\x63\xa8\x20"  # OP_IF OP_SHA256 PUSH32
+    HTLC_PREFIX_HEX = HTLC_PREFIX.hex()
+    HTLC_FIXED_LEN = 90  # Everything but the timelock
+    HTLC_MIN_SCRIPT_LEN = HTLC_FIXED_LEN + 1  # 1-byte timelock
+    HTLC_MAX_SCRIPT_LEN = HTLC_FIXED_LEN + 9  # 9-byte timelock
+
+    # Number of detected swaps buffered during backfill before a batch write
+    BACKFILL_BATCH_SIZE = 500
+
+    # Transactions per page of Mempool's /block/:hash/txs/:start, and how
+    # many page requests may be in flight across all blocks being fetched
+    BLOCK_TXS_PAGE_SIZE = 25
+    BLOCK_PAGE_CONCURRENCY = 4
+
+    # Single-transaction lookups allowed in flight at once
+    TX_FETCH_CONCURRENCY = 16
+
+    # mempool-blocks frames outgrow the 1 MiB websockets default at busy times
+    WS_MAX_FRAME_SIZE = 8 * 1024 * 1024
+
+    # Full-window deflate with context takeover both ways, so repetitive JSON
+    # (txids, scripts) compresses against earlier frames on the connection
+    _WS_DEFLATE = permessage_deflate.ClientPerMessageDeflateFactory(
+        server_no_context_takeover=False,
+        client_no_context_takeover=False,
+        server_max_window_bits=15,
+        client_max_window_bits=15,
     )
 
-    # Alternative pattern for different COMIT implementations
-    HTLC_PATTERN_ALT = re.compile(
-        rb"\x63"  # OP_IF
-        rb"\xa8\x20(.{32})\x88"  # OP_SHA256 <secret_hash> OP_EQUALVERIFY
-        rb"\x76\xa9\x14(.{20})\x88\xac"  # OP_DUP OP_HASH160 <recipient> OP_EQUALVERIFY OP_CHECKSIG
-        rb"\x67"  # OP_ELSE
-        rb"(.{2,9})\xb1\x75"  # <timelock> OP_CHECKLOCKTIMEVERIFY OP_DROP (more flexible timelock size)
-        rb"\x76\xa9\x14(.{20})\x88\xac"  # OP_DUP OP_HASH160 <sender> OP_EQUALVERIFY OP_CHECKSIG
-        rb"\x68",  # OP_ENDIF
-        re.DOTALL,
-    )
+    # Sent as-is on every (re)connect; kept as str so it goes out as a text frame
+    _SUBSCRIBE_FRAME = orjson.dumps(
+        {"action": "want", "data": ["mempool-blocks", "live-2h-chart"]}
+    ).decode()
 
     def __init__(self, database: SwapDatabase):
         """Initialize the swap watcher."""
         self.db = database
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # HTTP/2 with long-lived keep-alive so requests multiplex over one
+        # warm TLS connection to Mempool
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=64,
+                max_keepalive_connections=32,
+                keepalive_expiry=300.0,
+            ),
+        )
         self.watching = False
         self._watched_addresses: set[str] = set()
-        self._pending_htlcs: dict[str, HTLCTransaction] = {}
+        # Lock txid -> locked value in sats; the spend path needs nothing else
+        self._pending_htlcs: dict[str, int] = {}
+        # Set to a dict (keyed by lock txid) while backfilling: detected swaps
+        # are left unsaved for the caller to batch-write, and spends of them
+        # are resolved here before they reach the database.
+        self._unsaved_swaps: dict[str, AtomicSwap] | None = None
+        self._page_limit = asyncio.Semaphore(self.BLOCK_PAGE_CONCURRENCY)
+        self._tx_fetch_limit = asyncio.Semaphore(self.TX_FETCH_CONCURRENCY)
 
     async def start(self):
         """Start watching for swaps."""
@@ -90,6 +131,9 @@ class SwapWatcher:
                     ping_interval=20,
                     ping_timeout=10,
                     close_timeout=10,
+                    compression="deflate",
+                    extensions=[self._WS_DEFLATE],
+                    max_size=self.WS_MAX_FRAME_SIZE,
                 ) as ws:
                     logger.info("Connected to Mempool WebSocket")
                     retry_count = 0  # Reset on successful connection
@@ -107,21 +151,16 @@ class SwapWatcher:
 
     async def _subscribe_mempool_ws(self, ws):
         """Send subscription message to Mempool WebSocket."""
-        await ws.send(
-            json.dumps(
-                {
-                    "action": "want",
-                    "data": ["mempool-blocks", "live-2h-chart"],
-                }
-            )
-        )
+        await ws.send(self._SUBSCRIBE_FRAME)
 
     async def _handle_mempool_ws_messages(self, ws):
         """Process incoming messages from Mempool WebSocket."""
         while self.watching:
             try:
-                message = await asyncio.wait_for(ws.recv(), timeout=30)
-                data = json.loads(message)
+                # Take text frames as raw bytes: orjson parses them directly,
+                # so decoding to str first would only add a UTF-8 pass
+                message = await asyncio.wait_for(ws.recv(decode=False), timeout=30)
+                data = orjson.loads(message)
                 await self._process_mempool_ws_data(data)
             except asyncio.TimeoutError:
                 await ws.ping()
@@ -133,9 +172,20 @@ class SwapWatcher:
         """Process a single message from the Mempool WebSocket feed."""
         # Process mempool blocks (contains new transactions)
         if data.get("mempool-blocks"):
-            for block in data["mempool-blocks"]:
-                for tx in block.get("transactions", []):
-                    await self._process_transaction(tx["txid"])
+            txids = [
+                tx["txid"]
+                for block in data["mempool-blocks"]
+                for tx in block.get("transactions", [])
+            ]
+            # Fetch concurrently, then process in feed order so a spend is
+            # never handled before the lock it spends
+            fetched = await asyncio.gather(
+                *(self._get_transaction(txid) for txid in txids)
+            )
+            now = datetime.now(timezone.utc)
+            for txid, tx_data in zip(txids, fetched, strict=True):
+                if tx_data:
+                    await self._process_transaction(txid, tx_data, now)
         # Process individual transactions from live feed
         elif data.get("tx"):
             await self._process_transaction(data["tx"]["txid"])
@@ -154,34 +204,53 @@ class SwapWatcher:
         # This would require zmq or polling getrawmempool
         raise NotImplementedError("Bitcoin RPC watching not yet implemented")
 
-    async def _process_transaction(self, txid: str):
-        """Process a transaction to check if it's part of an atomic swap."""
+    async def _process_transaction(
+        self,
+        txid: str,
+        tx_data: dict[str, Any] | None = None,
+        now: datetime | None = None,
+    ) -> list[AtomicSwap]:
+        """
+        Process a transaction to check if it's part of an atomic swap.
+
+        Batch callers pass one ``now`` so every swap touched in the batch
+        shares a timestamp.
+        """
+        detected: list[AtomicSwap] = []
         try:
-            tx_data = await self._get_transaction(txid)
+            if tx_data is None:
+                tx_data = await self._get_transaction(txid)
             if not tx_data:
-                return
+                return detected
 
             # Check each output for HTLC pattern
             for idx, output in enumerate(tx_data.get("vout", [])):
                 if htlc_script := self._detect_htlc_script(output):
-                    await self._handle_htlc_detection(txid, idx, output, htlc_script)
+                    detected.append(
+                        await self._handle_htlc_detection(
+                            txid, idx, output, htlc_script, now
+                        )
+                    )
 
             # Check if this spends any watched HTLCs
             for input_data in tx_data.get("vin", []):
                 if spent_txid := input_data.get("txid"):
                     if spent_txid in self._pending_htlcs:
-                        await self._handle_htlc_spend(txid, spent_txid, input_data)
+                        await self._handle_htlc_spend(txid, spent_txid, input_data, now)
 
         except Exception as e:
             logger.error("Error processing transaction", txid=txid, error=str(e))
+        return detected
 
     async def _get_transaction(self, txid: str) -> dict[str, Any] | None:
         """Fetch transaction data from Mempool API."""
         try:
-            url = f"{config.mempool_api_url}/tx/{txid}"
-            response = await self.client.get(url)
-            response.raise_for_status()
-            return response.json()
+            async with self._tx_fetch_limit:
+                url = f"{config.mempool_api_url}/tx/{txid}"
+                response = await self.client.get(url)
+                response.raise_for_status()
+                # Amounts decode straight to Decimal, never via float
+                return response.json(parse_float=Decimal)
         except Exception as e:
             logger.error("Failed to fetch transaction", txid=txid, error=str(e))
             return None
@@ -189,43 +258,68 @@ class SwapWatcher:
     def _detect_htlc_script(self, output: dict[str, Any]) -> HTLCScript | None:
         """Detect if an output contains a COMIT HTLC script."""
         script_hex = output.get("scriptPubKey", {}).get("hex", "")
-        if not script_hex:
+        # Cheap gates on the hex text: length range and fixed prefix
+        if not (
+            2 * self.HTLC_MIN_SCRIPT_LEN
+            <= len(script_hex)
+            <= 2 * self.HTLC_MAX_SCRIPT_LEN
+        ) or not script_hex.startswith(self.HTLC_PREFIX_HEX):
             return None
 
-        script_bytes = bytes.fromhex(script_hex)
+        return self._parse_htlc_script(script_hex)
 
-        # Try primary pattern first
-        match = self.HTLC_PATTERN.match(script_bytes)
-        if not match:
-            # Try alternative pattern
-            match = self.HTLC_PATTERN_ALT.match(script_bytes)
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def _parse_htlc_script(script_hex: str) -> HTLCScript | None:
+        """
+        Parse a prefiltered candidate script into its HTLC fields.
 
-        if match:
-            secret_hash = match.group(1).hex()
-            recipient_pubkey_hash = match.group(2).hex()
-            timelock_bytes = match.group(3)
-            sender_pubkey_hash = match.group(4).hex()
+        Cached on the hex text: the same HTLC (and the same near-miss) is
+        seen again as it moves from mempool to block and on rescans, and
+        HTLCScript is frozen so the result can be shared.
+        """
+        script_bytes = bytes.fromhex(script_hex)
+        # OP_EQUALVERIFY OP_DUP OP_HASH160 PUSH20 <recipient> OP_EQUALVERIFY
+        # OP_CHECKSIG OP_ELSE
+        if (
+            script_bytes[35:39] != b"\x88\x76\xa9\x14"
+            or script_bytes[59:62] != b"\x88\xac\x67"
+        ):
+            return None
 
-            # Decode timelock (little-endian, handle variable length)
-            try:
-                timelock = int.from_bytes(timelock_bytes, byteorder="little")
+        # OP_CHECKLOCKTIMEVERIFY OP_DROP OP_DUP OP_HASH160 PUSH20 <sender>
+        # OP_EQUALVERIFY OP_CHECKSIG OP_ENDIF
+        n = len(script_bytes) - SwapWatcher.HTLC_FIXED_LEN
+        if (
+            script_bytes[62 + n : 67 + n] != b"\xb1\x75\x76\xa9\x14"
+            or script_bytes[87 + n :] != b"\x88\xac\x68"
+        ):
+            return None
 
-                # Validate timelock is reasonable (not too far in future)
-                if timelock > 2147483647:  # Max valid timestamp
-                    logger.debug("Invalid timelock detected", timelock=timelock)
-                    return None
+        secret_hash = script_bytes[3:35].hex()
+        recipient_pubkey_hash = script_bytes[39:59].hex()
+        timelock_bytes = script_bytes[62 : 62 + n]
+        sender_pubkey_hash = script_bytes[67 + n : 87 + n].hex()
 
-            except Exception as e:
-                logger.debug("Failed to decode timelock", error=str(e))
+        # Decode timelock (little-endian, handle variable length)
+        try:
+            timelock = int.from_bytes(timelock_bytes, byteorder="little")
+
+            # Validate timelock is reasonable (not too far in future)
+            if timelock > 2147483647:  # Max valid timestamp
+                logger.debug("Invalid timelock detected", timelock=timelock)
                 return None
 
-            return HTLCScript(
-                secret_hash=secret_hash,
-                recipient_pubkey_hash=recipient_pubkey_hash,
-                sender_pubkey_hash=sender_pubkey_hash,
-                timelock_height=timelock,
-            )
-        return None
+        except Exception as e:
+            logger.debug("Failed to decode timelock", error=str(e))
+            return None
+
+        return HTLCScript(
+            secret_hash=secret_hash,
+            recipient_pubkey_hash=recipient_pubkey_hash,
+            sender_pubkey_hash=sender_pubkey_hash,
+            timelock_height=timelock,
+        )
 
     async def _handle_htlc_detection(
         self,
@@ -233,9 +327,12 @@ class SwapWatcher:
         output_idx: int,
         output: dict[str, Any],
         htlc_script: HTLCScript,
-    ):
+        now: datetime | None = None,
+    ) -> AtomicSwap:
         """Handle detection of a new HTLC."""
-        amount_sats = int(output["value"] * COIN)
+        if now is None:
+            now = datetime.now(timezone.utc)
+        amount_sats = _btc_to_sats(output["value"])
 
         htlc_tx = HTLCTransaction(
             txid=txid,
@@ -254,8 +351,8 @@ class SwapWatcher:
             revealed_secret=None,
         )
 
-        # Store in pending HTLCs
-        self._pending_htlcs[txid] = htlc_tx
+        # Track the lock output for spend detection
+        self._pending_htlcs[txid] = amount_sats
 
         # Create swap record
         swap = AtomicSwap(
@@ -267,23 +364,33 @@ class SwapWatcher:
             btc_amount=Decimal(amount_sats) / COIN,
             xmr_amount=None,
             btc_xmr_rate=None,
-            detected_at=datetime.now(timezone.utc),
-            last_updated=datetime.now(timezone.utc),
+            detected_at=now,
+            last_updated=now,
             notification_sent=None,
         )
 
-        await self.db.save_swap(swap)
+        if self._unsaved_swaps is None:
+            await self.db.save_swap(swap)
+        else:
+            self._unsaved_swaps[txid] = swap
         logger.info(
             "Detected new HTLC", swap_id=swap.swap_id, amount_btc=swap.btc_amount
         )
+        return swap
 
     async def _handle_htlc_spend(
-        self, spending_txid: str, spent_txid: str, input_data: dict[str, Any]
+        self,
+        spending_txid: str,
+        spent_txid: str,
+        input_data: dict[str, Any],
+        now: datetime | None = None,
     ):
         """Handle spending of an HTLC (redeem or refund)."""
-        htlc = self._pending_htlcs.get(spent_txid)
-        if not htlc:
+        value_sats = self._pending_htlcs.get(spent_txid)
+        if value_sats is None:
             return
+        if now is None:
+            now = datetime.now(timezone.utc)
 
         # Determine if this is a redeem or refund
         witness = input_data.get("witness", [])
@@ -299,8 +406,12 @@ class SwapWatcher:
             htlc_type = HTLCType.REFUND
             secret = None
 
-        # Update swap record
-        swap = await self.db.get_swap_by_lock_txid(spent_txid)
+        # Update swap record; during backfill the lock may not be written yet
+        swap = None
+        if self._unsaved_swaps is not None:
+            swap = self._unsaved_swaps.get(spent_txid)
+        if swap is None:
+            swap = await self.db.get_swap_by_lock_txid(spent_txid)
         if swap:
             if htlc_type == HTLCType.REDEEM:
                 swap.current_state = SwapState.REDEEMED
@@ -316,7 +427,7 @@ class SwapWatcher:
                     confirmation_count=0,
                     htlc_classification=HTLCType.REDEEM,
                     script_details=None,
-                    value_sats=htlc.value_sats,
+                    value_sats=value_sats,
                     output_index=0,
                     revealed_secret=secret,
                 )
@@ -334,12 +445,12 @@ class SwapWatcher:
                     confirmation_count=0,
                     htlc_classification=HTLCType.REFUND,
                     script_details=None,
-                    value_sats=htlc.value_sats,
+                    value_sats=value_sats,
                     output_index=0,
                     revealed_secret=None,
                 )
 
-            swap.last_updated = datetime.now(timezone.utc)
+            swap.last_updated = now
             await self.db.save_swap(swap)
 
             logger.info(
@@ -357,32 +468,68 @@ class SwapWatcher:
         await self._process_transaction(txid)
         return await self.db.get_swap_by_lock_txid(txid)
 
-    async def backfill(self, start_height: int, end_height: int):
-        """Backfill historical swaps between block heights."""
-        logger.info(
-            "Starting backfill", start_height=start_height, end_height=end_height
-        )
-
-        for height in range(start_height, end_height + 1):
-            try:
-                # Get block hash
-                url = f"{config.mempool_api_url}/block-height/{height}"
-                response = await self.client.get(url)
-                block_hash = response.text.strip()
+    def begin_backfill(self):
+        """Stop saving detections so a backfill can batch-write them."""
+        self._unsaved_swaps = {}
 
-                # Get block transactions
-                url = f"{config.mempool_api_url}/block/{block_hash}/txids"
-                response = await self.client.get(url)
-                txids = response.json()
+    def end_backfill(self):
+        """Return to saving each detection as it happens."""
+        self._unsaved_swaps = None
 
-                # Process each transaction
-                for txid in txids:
-                    await self._process_transaction(txid)
-                    await asyncio.sleep(0.1)  # Rate limiting
+    async def fetch_block(self, height: int) -> list[dict[str, Any]]:
+        """Fetch the full transaction data for every transaction in a block."""
+        try:
+            # Get block hash
+            url = f"{config.mempool_api_url}/block-height/{height}"
+            response = await self.client.get(url)
+            block_hash = response.text.strip()
 
-                logger.info("Processed block", height=height, tx_count=len(txids))
+            url = f"{config.mempool_api_url}/block/{block_hash}"
+            response = await self.client.get(url)
+            response.raise_for_status()
+            tx_count = response.json()["tx_count"]
+            logger.debug(
+                "Fetched block header",
+                height=height,
+                http_version=response.http_version,
+            )
 
-            except Exception as e:
-                logger.error("Error processing block", height=height, error=str(e))
+            # Full transactions come back a page at a time; fetch the pages
+            # together and keep them in block order
+            pages = await asyncio.gather(
+                *(
+                    self._fetch_block_page(block_hash, start)
+                    for start in range(0, tx_count, self.BLOCK_TXS_PAGE_SIZE)
+                )
+            )
+            return [tx_data for page in pages for tx_data in page]
 
-        logger.info("Backfill complete")
+        except Exception as e:
+            logger.error("Error fetching block", height=height, error=str(e))
+            return []
+
+    async def _fetch_block_page(
+        self, block_hash: str, start: int
+    ) -> list[dict[str, Any]]:
+        """Fetch one page of full transactions from a block."""
+        async with self._page_limit:
+            url = f"{config.mempool_api_url}/block/{block_hash}/txs/{start}"
+            response = await self.client.get(url)
+            response.raise_for_status()
+            return response.json(parse_float=Decimal)
+
+    async def scan_block(
+        self, height: int, transactions: list[dict[str, Any]]
+    ) -> list[AtomicSwap]:
+        """Run HTLC detection over a fetched block, returning new swaps."""
+        detected: list[AtomicSwap] = []
+        now = datetime.now(timezone.utc)
+        for tx_data in transactions:
+            detected.extend(
+                await self._process_transaction(tx_data["txid"], tx_data, now)
+            )
+        logger.info("Processed block", height=height, tx_count=len(transactions))
+        logger.debug(
+            "HTLC parse cache", **self._parse_htlc_script.cache_info()._asdict()
+        )
+        return detected
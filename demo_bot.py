@@ -19,8 +19,11 @@ from datetime import datetime, timezone
 from decimal import Decimal
 
 import structlog
+from dotenv import load_dotenv
 from structlog.stdlib import LoggerFactory
 
+load_dotenv()
+
 # Configure structured logging
 structlog.configure(
     processors=[
@@ -53,6 +56,7 @@ async def create_demo_swap():
     from comit_swap_bot.price_fetcher import PriceFetcher
 
     print("🎭 Creating demo atomic swap...")
+    now = datetime.now(timezone.utc)
 
     # Create realistic HTLC script
     htlc_script = HTLCScript(
@@ -71,7 +75,7 @@ async def create_demo_swap():
         weight_units=900,
         fee_sats=Decimal("2500"),
         block_height=849750,
-        block_time=datetime.now(timezone.utc),
+        block_time=now,
         confirmation_count=1,
         htlc_classification=HTLCType.LOCK,
         script_details=htlc_script,
@@ -101,8 +105,8 @@ async def create_demo_swap():
         btc_amount=btc_amount,
         xmr_amount=xmr_amount,
         btc_xmr_rate=current_rate,
-        detected_at=datetime.now(timezone.utc),
-        last_updated=datetime.now(timezone.utc),
+        detected_at=now,
+        last_updated=now,
         notification_sent=None,
     )
 
@@ -160,6 +164,7 @@ async def run_demo_bot(demo_mode=False):
 
         await db.close()
         await price_fetcher.close()
+        await notifier.close()
         return
 
     # Real mode - watch for actual swaps
@@ -188,6 +193,7 @@ async def run_demo_bot(demo_mode=False):
     finally:
         await db.close()
         await price_fetcher.close()
+        await notifier.close()
 
 
 def check_twitter_credentials():
@@ -199,14 +205,6 @@ def check_twitter_credentials():
         "TWITTER_ACCESS_TOKEN_SECRET"
     ]
 
-    # Try to load .env file
-    if os.path.exists(".env"):
-        with open(".env") as f:
-            for line in f:
-                if "=" in line and not line.startswith("#"):
-                    key, value = line.strip().split("=", 1)
-                    os.environ[key] = value
-
     missing = [var for var in required_vars if not os.getenv(var)]
 
     if missing:
@@ -224,6 +222,9 @@ def check_twitter_credentials():
 
 def main():
     """Main entry point."""
+    from comit_swap_bot.event_loop import install_uvloop
+
+    install_uvloop()
     print("🔄 COMIT Atomic Swap Bot - Demo Runner")
     print("=" * 45)
 
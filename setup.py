@@ -8,12 +8,15 @@ setup(
     python_requires=">=3.8",
     install_requires=[
         "structlog>=23.0.0",
-        "httpx>=0.24.0",
-        "websockets>=11.0.0",
-        "tweepy>=4.14.0",
+        "httpx[http2]>=0.24.0",
+        "websockets>=14.0",
+        "tweepy[async]>=4.14.0",
         "apprise>=1.4.0",
         "aiohttp>=3.8.0",
         "cachetools>=5.3.0",
+        "diskcache>=5.6.0",
+        "orjson>=3.9.0",
+        "uvloop>=0.19.0; sys_platform != 'win32'",
         "python-bitcoinlib>=0.12.0",
         "aiosqlite>=0.19.0",
         "sqlalchemy>=2.0.0",
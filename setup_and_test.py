@@ -11,6 +11,10 @@ This script helps you:
 import os
 import sys
 
+from dotenv import load_dotenv
+
+load_dotenv()
+
 
 def _get_credential_specs():
     """Get Twitter credential specifications."""
@@ -122,15 +126,6 @@ def run_twitter_test():
         print(f"❌ Missing credentials: {', '.join(missing_vars)}")
         return False
 
-    # Load .env file if it exists
-    if os.path.exists(".env"):
-        print("📂 Loading credentials from .env file...")
-        with open(".env") as f:
-            for line in f:
-                if "=" in line and not line.startswith("#"):
-                    key, value = line.strip().split("=", 1)
-                    os.environ[key] = value
-
     print("🚀 Starting Twitter test...")
 
     # Run the test script
@@ -36,6 +36,7 @@ from comit_swap_bot.price_fetcher import PriceFetcher
 
 async def create_mock_swap() -> AtomicSwap:
     """Create a realistic mock atomic swap for testing."""
+    now = datetime.now(timezone.utc)
 
     # Create HTLC script details
     htlc_script = HTLCScript(
@@ -54,7 +55,7 @@ async def create_mock_swap() -> AtomicSwap:
         weight_units=1000,
         fee_sats=Decimal("1500"),
         block_height=849500,
-        block_time=datetime.now(timezone.utc),
+        block_time=now,
         confirmation_count=3,
         htlc_classification=HTLCType.LOCK,
         script_details=htlc_script,
@@ -84,8 +85,8 @@ async def create_mock_swap() -> AtomicSwap:
         btc_amount=btc_amount,
         xmr_amount=xmr_amount,
         btc_xmr_rate=current_rate,
-        detected_at=datetime.now(timezone.utc),
-        last_updated=datetime.now(timezone.utc),
+        detected_at=now,
+        last_updated=now,
         notification_sent=None,
     )
 
@@ -106,33 +107,29 @@ async def test_twitter_post():
         print(f"   TX ID: {swap.lock_transaction.txid}")
 
         print("\n📝 Creating Twitter notification...")
-        notifier = TwitterNotifier()
-        notification = SwapNotification(
-            swap=swap,
-            message="Test atomic swap notification"
-        )
-
-        # Show the message that would be tweeted
-        message = notifier.format_swap_message(swap)
-        print(f"\n📱 Tweet message ({len(message)} characters):")
-        print("=" * 50)
-        print(message)
-        print("=" * 50)
-
-        # Ask for confirmation before posting
-        confirm = input("\n🤔 Post this tweet? [y/N]: ").strip().lower()
-        if confirm != 'y':
-            print("❌ Tweet cancelled.")
-            return
-
-        print("\n🐦 Posting to Twitter...")
-        success = await notifier.notify(notification)
-
-        if success:
-            print("✅ Successfully posted to Twitter!")
-            print("🎉 Check your Twitter account to see the tweet.")
-        else:
-            print("❌ Failed to post to Twitter. Check your credentials and try again.")
+        async with TwitterNotifier() as notifier:
+            # Show the message that will be tweeted
+            message = notifier.format_swap_message(swap)
+            notification = SwapNotification(swap=swap, message=message)
+            print(f"\n📱 Tweet message ({len(message)} characters):")
+            print("=" * 50)
+            print(message)
+            print("=" * 50)
+
+            # Ask for confirmation before posting
+            confirm = input("\n🤔 Post this tweet? [y/N]: ").strip().lower()
+            if confirm != 'y':
+                print("❌ Tweet cancelled.")
+                return
+
+            print("\n🐦 Posting to Twitter...")
+            success = await notifier.notify(notification)
+
+            if success:
+                print("✅ Successfully posted to Twitter!")
+                print("🎉 Check your Twitter account to see the tweet.")
+            else:
+                print("❌ Failed to post to Twitter. Check your credentials and try again.")
 
     except Exception as e:
         print(f"💥 Error: {e}")
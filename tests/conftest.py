@@ -0,0 +1,31 @@
+"""Shared test fixtures."""
+
+import asyncio
+import time
+
+import pytest_asyncio
+
+# How often the watchdog wakes, and how late it may wake before the test fails
+WATCHDOG_INTERVAL = 0.05
+MAX_LOOP_LAG = 0.2
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def loop_watchdog():
+    """Fail any test whose code blocks the event loop for too long."""
+    max_lag = 0.0
+
+    async def watch():
+        nonlocal max_lag
+        while True:
+            # perf_counter rather than loop.time(), which tests may patch
+            # through time.monotonic
+            started = time.perf_counter()
+            await asyncio.sleep(WATCHDOG_INTERVAL)
+            lag = time.perf_counter() - started - WATCHDOG_INTERVAL
+            max_lag = max(max_lag, lag)
+
+    task = asyncio.create_task(watch())
+    yield
+    task.cancel()
+    assert max_lag < MAX_LOOP_LAG, f"Event loop blocked for {max_lag:.3f}s"
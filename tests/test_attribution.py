@@ -1,6 +1,6 @@
 """Test attribution functionality."""
 
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
 
 import pytest
@@ -50,6 +50,7 @@ def test_swap_message_includes_attribution():
         output_index=0,
     )
 
+    now = datetime.now(timezone.utc)
     swap = AtomicSwap(
         swap_id="test-swap-123",
         lock_transaction=lock_tx,
@@ -57,8 +58,8 @@ def test_swap_message_includes_attribution():
         btc_amount=Decimal("0.5"),
         xmr_amount=Decimal("7.5"),  # Simulated XMR amount
         btc_xmr_rate=Decimal("15.0"),  # Simulated rate
-        detected_at=datetime.utcnow(),
-        last_updated=datetime.utcnow(),
+        detected_at=now,
+        last_updated=now,
     )
 
     # Test message formatting
@@ -86,14 +87,15 @@ def test_swap_message_without_price_data():
         output_index=0,
     )
 
+    now = datetime.now(timezone.utc)
     swap = AtomicSwap(
         swap_id="test-swap-456",
         lock_transaction=lock_tx,
         current_state=SwapState.LOCKED,
         btc_amount=Decimal("0.5"),
         # No xmr_amount or btc_xmr_rate
-        detected_at=datetime.utcnow(),
-        last_updated=datetime.utcnow(),
+        detected_at=now,
+        last_updated=now,
     )
 
     notifier = TwitterNotifier()
@@ -0,0 +1,222 @@
+"""Tests for swap database."""
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+
+from comit_swap_bot.config import config
+from comit_swap_bot.database import SwapDatabase
+from comit_swap_bot.models import AtomicSwap, HTLCTransaction, HTLCType, SwapState
+
+# Schema written by versions that stored every queryable field as a real
+# column next to the JSON
+LEGACY_SCHEMA = """
+CREATE TABLE atomic_swaps (
+    swap_id VARCHAR NOT NULL PRIMARY KEY,
+    lock_txid VARCHAR NOT NULL,
+    redeem_txid VARCHAR,
+    refund_txid VARCHAR,
+    current_state VARCHAR NOT NULL,
+    btc_amount NUMERIC(16, 8) NOT NULL,
+    xmr_amount NUMERIC(16, 8),
+    btc_xmr_rate NUMERIC(16, 8),
+    detected_at DATETIME NOT NULL,
+    last_updated DATETIME NOT NULL,
+    notification_sent VARCHAR,
+    full_swap_json TEXT NOT NULL
+);
+CREATE INDEX ix_atomic_swaps_lock_txid ON atomic_swaps (lock_txid);
+CREATE INDEX idx_detection_time ON atomic_swaps (detected_at);
+CREATE INDEX idx_swap_state ON atomic_swaps (current_state);
+CREATE INDEX idx_state_time ON atomic_swaps (current_state, detected_at);
+CREATE INDEX idx_notification_status ON atomic_swaps (notification_sent);
+"""
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of a fresh database file."""
+    return tmp_path / "swaps.db"
+
+
+@pytest_asyncio.fixture
+async def db(db_path):
+    """Create a database in a fresh file."""
+    db = await open_database(db_path)
+    yield db
+    await db.close()
+
+
+async def open_database(path) -> SwapDatabase:
+    """Open and initialise a SwapDatabase on the given file."""
+    db_config = config.model_copy(
+        update={"database_url": f"sqlite+aiosqlite:///{path}"}
+    )
+    with patch("comit_swap_bot.database.config", db_config):
+        db = SwapDatabase()
+    await db.init()
+    return db
+
+
+def make_swap(txid: str, detected_at: datetime | None = None) -> AtomicSwap:
+    """Build a locked swap for the given lock txid."""
+    now = detected_at or datetime(2025, 5, 29, 12, 0, 0, tzinfo=timezone.utc)
+    return AtomicSwap(
+        swap_id=f"{txid}:0",
+        lock_transaction=HTLCTransaction(
+            txid=txid,
+            version=2,
+            locktime=0,
+            byte_size=250,
+            weight_units=1000,
+            htlc_classification=HTLCType.LOCK,
+            value_sats=10000000,
+            output_index=0,
+        ),
+        current_state=SwapState.LOCKED,
+        btc_amount=Decimal("0.1"),
+        detected_at=now,
+        last_updated=now,
+    )
+
+
+class TestSwapDatabase:
+    """Test swap persistence and the lookup cache."""
+
+    @pytest.mark.asyncio
+    async def test_read_overlapping_a_write_is_not_cached(self, db):
+        """Test that a read which raced a save can't cache the old row."""
+        swap = make_swap("a" * 64)
+        await db.save_swap(swap)
+        db._by_id.clear()
+        db._by_lock.clear()
+
+        fetch_json = db._fetch_json
+
+        async def fetch_then_save(stmt, params):
+            rows = await fetch_json(stmt, params)
+            await db.save_swap(swap.model_copy(update={"btc_xmr_rate": Decimal("150")}))
+            return rows
+
+        with patch.object(db, "_fetch_json", fetch_then_save):
+            stale = await db.get_swap(swap.swap_id)
+
+        assert stale.btc_xmr_rate is None
+        fresh = await db.get_swap(swap.swap_id)
+        assert fresh.btc_xmr_rate == Decimal("150")
+
+    @pytest.mark.asyncio
+    async def test_update_tweet_id_evicts_cached_swap(self, db):
+        """Test that a tweet ID update is visible through both lookups."""
+        swap = make_swap("b" * 64)
+        await db.save_swap(swap)
+        assert (await db.get_swap(swap.swap_id)).notification_sent is None
+
+        await db.update_tweet_id(swap.swap_id, "1234567890")
+
+        assert swap.swap_id not in db._by_id
+        assert (await db.get_swap(swap.swap_id)).notification_sent == "1234567890"
+        by_lock = await db.get_swap_by_lock_txid(swap.lock_transaction.txid)
+        assert by_lock.notification_sent == "1234567890"
+
+    @pytest.mark.asyncio
+    async def test_partial_updates_evict_lock_cache_alone(self, db):
+        """Test eviction when only the by-lock cache still holds the swap."""
+        swap = make_swap("e" * 64)
+        txid = swap.lock_transaction.txid
+        await db.save_swap(swap)
+        db._by_id.clear()
+        assert txid in db._by_lock
+
+        await db.update_tweet_id(swap.swap_id, "1234567890")
+        assert (await db.get_swap_by_lock_txid(txid)).notification_sent == "1234567890"
+
+        db._by_id.clear()
+        assert txid in db._by_lock
+        priced = swap.model_copy(update={"btc_xmr_rate": Decimal("150")})
+        await db.save_swap_prices([priced])
+        assert (await db.get_swap_by_lock_txid(txid)).btc_xmr_rate == Decimal("150")
+
+    @pytest.mark.asyncio
+    async def test_migrates_legacy_table(self, db_path):
+        """Test that a pre-generated-column table is rebuilt with its rows."""
+        older = make_swap("c" * 64, datetime(2025, 5, 1, tzinfo=timezone.utc))
+        newer = make_swap("d" * 64, older.detected_at + timedelta(days=1))
+
+        legacy = sqlite3.connect(db_path)
+        legacy.executescript(LEGACY_SCHEMA)
+        for swap, tweet_id in ((older, "1234567890"), (newer, None)):
+            legacy.execute(
+                "INSERT INTO atomic_swaps VALUES (?, ?, NULL, NULL, ?, ?, NULL, "
+                "NULL, ?, ?, ?, ?)",
+                (
+                    swap.swap_id,
+                    swap.lock_transaction.txid,
+                    swap.current_state.value,
+                    str(swap.btc_amount),
+                    swap.detected_at.isoformat(),
+                    swap.last_updated.isoformat(),
+                    tweet_id,
+                    swap.to_json(),
+                ),
+            )
+        legacy.commit()
+        legacy.close()
+
+        db = await open_database(db_path)
+        try:
+            # Rows survive, with the tweet ID moved into the JSON
+            migrated = await db.get_swap(older.swap_id)
+            assert migrated.notification_sent == "1234567890"
+            assert migrated.lock_transaction.txid == older.lock_transaction.txid
+            assert (await db.get_swap(newer.swap_id)).notification_sent is None
+
+            recent = await db.get_recent_swaps()
+            assert [swap.swap_id for swap in recent] == [
+                newer.swap_id,
+                older.swap_id,
+            ]
+            # Only the locked swap nobody has tweeted about is still pending
+            assert await db.get_pending_swap_keys() == [
+                (newer.swap_id, newer.lock_transaction.txid)
+            ]
+        finally:
+            await db.close()
+
+        migrated_db = sqlite3.connect(db_path)
+        try:
+            # Queryable fields are now virtual generated columns (hidden == 2)
+            columns = {
+                row[1]: row[6]
+                for row in migrated_db.execute("PRAGMA table_xinfo(atomic_swaps)")
+            }
+            assert columns["swap_id"] == 0
+            assert columns["full_swap_json"] == 0
+            assert columns["lock_txid"] == 2
+            assert columns["notification_sent"] == 2
+
+            row = migrated_db.execute(
+                "SELECT lock_txid, current_state, notification_sent "
+                "FROM atomic_swaps WHERE swap_id = ?",
+                (older.swap_id,),
+            ).fetchone()
+            assert row == (older.lock_transaction.txid, "locked", "1234567890")
+
+            indexes = {
+                row[0]
+                for row in migrated_db.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' "
+                    "AND tbl_name = 'atomic_swaps'"
+                )
+            }
+            assert {"idx_detection_time", "idx_state_time"} <= indexes
+            tables = migrated_db.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            ).fetchall()
+            assert tables == [("atomic_swaps",)]
+        finally:
+            migrated_db.close()
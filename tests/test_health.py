@@ -0,0 +1,76 @@
+"""Tests for health check server."""
+
+import orjson
+import pytest
+import pytest_asyncio
+from aiohttp.test_utils import TestClient, TestServer
+
+from comit_swap_bot.health import HealthServer
+
+
+@pytest.fixture
+def health_server():
+    """Create a health server that isn't bound to a port."""
+    return HealthServer()
+
+
+@pytest_asyncio.fixture
+async def client(health_server):
+    """Create a test client for the health server's app."""
+    async with TestClient(TestServer(health_server.app)) as client:
+        yield client
+
+
+class TestHealthServer:
+    """Test health check endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_health(self, client):
+        """Test the health endpoint body and headers."""
+        response = await client.get("/health")
+
+        assert response.status == 200
+        assert response.content_type == "application/json"
+        assert response.headers["Cache-Control"] == "no-store"
+        body = orjson.loads(await response.read())
+        assert body["status"] == "healthy"
+        assert body["service"] == "comit-swap-bot"
+        assert body["timestamp"].endswith("+00:00")
+
+    @pytest.mark.asyncio
+    async def test_status_includes_updates(self, health_server, client):
+        """Test that status updates show up in the status endpoint."""
+        health_server.update_status(watcher_running=True, swaps_processed=3)
+
+        response = await client.get("/status")
+
+        assert response.status == 200
+        assert response.content_type == "application/json"
+        body = orjson.loads(await response.read())
+        assert body["status"] == "running"
+        assert body["service"] == "comit-swap-bot"
+        assert body["watcher_running"] is True
+        assert body["swaps_processed"] == 3
+
+    @pytest.mark.asyncio
+    async def test_status_field_replaces_fixed_key(self, health_server, client):
+        """Test that a status field named like a fixed key isn't repeated."""
+        health_server.update_status(status="degraded")
+
+        raw = await (await client.get("/status")).read()
+
+        assert raw.count(b'"status"') == 1
+        assert orjson.loads(raw)["status"] == "degraded"
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_refresh(self):
+        """Test that stopping the server cancels the timestamp refresh."""
+        health_server = HealthServer(port=0)
+        await health_server.start()
+        handle = health_server._refresh_handle
+        assert handle is not None
+
+        await health_server.stop()
+
+        assert handle.cancelled()
+        assert health_server._refresh_handle is None
@@ -1,13 +1,28 @@
 """Tests for notification system."""
 
+import time
 from datetime import datetime, timezone
 from decimal import Decimal
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+from tweepy.errors import TooManyRequests
 
-from comit_swap_bot.models import AtomicSwap, HTLCTransaction, HTLCType, SwapState
-from comit_swap_bot.notifiers import ConsoleNotifier, SwapNotification, TwitterNotifier
+from comit_swap_bot.models import (
+    NOTIFIED_WITHOUT_TWEET,
+    AtomicSwap,
+    HTLCTransaction,
+    HTLCType,
+    SwapState,
+)
+from comit_swap_bot.notifiers import (
+    MAX_NOTIFY_ATTEMPTS,
+    AppriseNotifier,
+    ConsoleNotifier,
+    NotificationManager,
+    SwapNotification,
+    TwitterNotifier,
+)
 
 
 @pytest.fixture
@@ -66,8 +81,9 @@ class TestTwitterNotifier:
             mock_config.twitter_access_token = "test_token"
             mock_config.twitter_access_token_secret = "test_token_secret"
 
-            with patch("comit_swap_bot.notifiers.tweepy.Client") as mock_client:
+            with patch("comit_swap_bot.notifiers.AsyncClient") as mock_client:
                 mock_instance = Mock()
+                mock_instance.create_tweet = AsyncMock()
                 mock_instance.create_tweet.return_value = Mock(
                     data={"id": "1234567890"}
                 )
@@ -81,7 +97,68 @@ class TestTwitterNotifier:
                 result = await notifier.notify(notification)
 
                 assert result is True
-                mock_instance.create_tweet.assert_called_once()
+                assert notification.tweet_id == "1234567890"
+                mock_instance.create_tweet.assert_awaited_once_with(
+                    text="Test notification"
+                )
+                # A 429 fails the tweet instead of sleeping inside the call
+                assert not mock_client.call_args.kwargs.get("wait_on_rate_limit")
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_pauses_tweeting(self, sample_swap):
+        """Test that a 429 fails fast and holds tweets until the reset."""
+        with patch("comit_swap_bot.notifiers.config") as mock_config:
+            mock_config.twitter_api_key = "test_key"
+            mock_config.twitter_api_secret = "test_secret"
+            mock_config.twitter_access_token = "test_token"
+            mock_config.twitter_access_token_secret = "test_token_secret"
+
+            with patch("comit_swap_bot.notifiers.AsyncClient") as mock_client:
+                reset = int(time.time()) + 900
+                response = Mock(status=429, headers={"x-rate-limit-reset": str(reset)})
+                mock_instance = Mock()
+                mock_instance.create_tweet = AsyncMock(
+                    side_effect=TooManyRequests(response, response_json={})
+                )
+                mock_client.return_value = mock_instance
+
+                notifier = TwitterNotifier()
+                notification = SwapNotification(
+                    swap=sample_swap, message="Test notification"
+                )
+
+                assert await notifier.notify(notification) is False
+                assert not notifier.available()
+                assert await notifier.notify(notification) is False
+                mock_instance.create_tweet.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_tweets_share_one_session(self, sample_swap):
+        """Test that tweets reuse one API session until the notifier closes."""
+        with patch("comit_swap_bot.notifiers.config") as mock_config:
+            mock_config.twitter_api_key = "test_key"
+            mock_config.twitter_api_secret = "test_secret"
+            mock_config.twitter_access_token = "test_token"
+            mock_config.twitter_access_token_secret = "test_token_secret"
+
+            with patch("comit_swap_bot.notifiers.AsyncClient") as mock_client:
+                mock_instance = Mock(session=None)
+                mock_instance.create_tweet = AsyncMock(
+                    return_value=Mock(data={"id": "1234567890"})
+                )
+                mock_client.return_value = mock_instance
+                notification = SwapNotification(
+                    swap=sample_swap, message="Test notification"
+                )
+
+                async with TwitterNotifier() as notifier:
+                    await notifier.notify(notification)
+                    session = mock_instance.session
+                    await notifier.notify(notification)
+                    assert mock_instance.session is session
+
+                assert session.closed
+                assert mock_instance.session is None
 
 
 class TestConsoleNotifier:
@@ -91,7 +168,9 @@ class TestConsoleNotifier:
     async def test_console_output(self, sample_swap, capsys):
         """Test console notification output."""
         notifier = ConsoleNotifier()
-        notification = SwapNotification(swap=sample_swap, message="Test notification")
+        notification = SwapNotification(
+            swap=sample_swap, message=notifier.format_swap_message(sample_swap)
+        )
 
         result = await notifier.notify(notification)
 
@@ -99,3 +178,107 @@ class TestConsoleNotifier:
         captured = capsys.readouterr()
         assert "New BTC⇆XMR Atomic Swap!" in captured.out
         assert "abc123def456789" in captured.out
+
+
+class TestAppriseNotifier:
+    """Test Apprise notification functionality."""
+
+    @pytest.mark.asyncio
+    async def test_truthy_result_counts_as_sent(self, sample_swap):
+        """Test that a non-bool but truthy Apprise result is a success."""
+
+        class Result:
+            # Stands in for the AppriseResult newer versions return
+            def __bool__(self):
+                return True
+
+        notifier = AppriseNotifier(urls=["json://localhost"])
+        notifier.apprise.async_notify = AsyncMock(return_value=Result())
+        notification = SwapNotification(swap=sample_swap, message="Test")
+
+        assert await notifier.notify(notification) is True
+
+    @pytest.mark.asyncio
+    async def test_no_urls_counts_as_sent(self, sample_swap):
+        """Test that an Apprise notifier with no targets doesn't fail swaps."""
+        with patch("comit_swap_bot.notifiers.config") as mock_config:
+            mock_config.apprise_urls = []
+            notifier = AppriseNotifier()
+        notification = SwapNotification(swap=sample_swap, message="Test")
+
+        assert await notifier.notify(notification) is True
+
+
+@pytest.fixture
+def manager():
+    """Create a notification manager with no notifiers configured."""
+    with patch("comit_swap_bot.notifiers.config") as mock_config:
+        mock_config.enable_twitter = False
+        mock_config.enable_apprise = False
+        manager = NotificationManager()
+    manager.notifiers.clear()
+    return manager
+
+
+class TestNotificationManager:
+    """Test fan-out to every notifier."""
+
+    @pytest.mark.asyncio
+    async def test_notify_swap_result(self, manager, sample_swap):
+        """Test what notify_swap reports for the database to record."""
+        manager.notifiers.append(ConsoleNotifier())
+        other = Mock(notify=AsyncMock(return_value=False))
+        manager.notifiers.append(other)
+
+        # Any undelivered notification means the swap should be retried
+        assert await manager.notify_swap(sample_swap) is None
+        other.notify.return_value = True
+        assert await manager.notify_swap(sample_swap) == NOTIFIED_WITHOUT_TWEET
+
+        async def tweet(notification):
+            notification.tweet_id = "1234567890"
+            return True
+
+        # A posted tweet is recorded even if another notifier failed
+        manager.notifiers.append(Mock(notify=tweet))
+        other.notify.return_value = False
+        assert await manager.notify_swap(sample_swap) == "1234567890"
+
+    @pytest.mark.asyncio
+    async def test_retry_skips_delivered_notifiers(self, manager, sample_swap):
+        """Test that a retry doesn't resend to notifiers that delivered."""
+        working = Mock(notify=AsyncMock(return_value=True))
+        failing = Mock(notify=AsyncMock(return_value=False))
+        manager.notifiers.extend([working, failing])
+
+        assert await manager.notify_swap(sample_swap) is None
+        failing.notify.return_value = True
+        assert await manager.notify_swap(sample_swap) == NOTIFIED_WITHOUT_TWEET
+
+        working.notify.assert_awaited_once()
+        assert failing.notify.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_gives_up_on_failing_notifier(self, manager, sample_swap):
+        """Test that a channel that never works stops holding the swap."""
+        failing = Mock(notify=AsyncMock(return_value=False))
+        manager.notifiers.append(failing)
+
+        for _ in range(MAX_NOTIFY_ATTEMPTS - 1):
+            assert await manager.notify_swap(sample_swap) is None
+        assert await manager.notify_swap(sample_swap) == NOTIFIED_WITHOUT_TWEET
+        assert failing.notify.await_count == MAX_NOTIFY_ATTEMPTS
+
+    @pytest.mark.asyncio
+    async def test_unavailable_notifier_is_skipped(self, manager, sample_swap):
+        """Test that passes spent waiting out a rate limit aren't counted."""
+        limited = Mock(notify=AsyncMock(return_value=True))
+        limited.available.return_value = False
+        manager.notifiers.append(limited)
+
+        for _ in range(MAX_NOTIFY_ATTEMPTS + 1):
+            assert await manager.notify_swap(sample_swap) is None
+        limited.notify.assert_not_awaited()
+
+        limited.available.return_value = True
+        assert await manager.notify_swap(sample_swap) == NOTIFIED_WITHOUT_TWEET
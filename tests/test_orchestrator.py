@@ -0,0 +1,165 @@
+"""Tests for swap orchestrator."""
+
+import asyncio
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+import pytest_asyncio
+
+from comit_swap_bot.config import config
+from comit_swap_bot.database import SwapDatabase
+from comit_swap_bot.models import AtomicSwap, HTLCTransaction, HTLCType, SwapState
+from comit_swap_bot.orchestrator import SwapOrchestrator
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    """Create a database in a fresh file."""
+    db_config = config.model_copy(
+        update={"database_url": f"sqlite+aiosqlite:///{tmp_path / 'swaps.db'}"}
+    )
+    with patch("comit_swap_bot.database.config", db_config):
+        db = SwapDatabase()
+    await db.init()
+    yield db
+    await db.close()
+
+
+@pytest.fixture
+def orchestrator(db):
+    """Create an orchestrator with a fixed BTC/XMR rate and mocked notifiers."""
+    return make_orchestrator(db)
+
+
+def make_orchestrator(db: SwapDatabase) -> SwapOrchestrator:
+    """Build an orchestrator whose notifications all tweet successfully."""
+    price_service = Mock()
+    price_service.get_btc_to_xmr_rate = AsyncMock(return_value=Decimal("150"))
+    return SwapOrchestrator(
+        mempool_watcher=Mock(),
+        price_service=price_service,
+        notification_mgr=Mock(notify_swap=AsyncMock(return_value="1234567890")),
+        swap_db=db,
+        enable_health_server=False,
+    )
+
+
+def make_swap(txid: str) -> AtomicSwap:
+    """Build a locked swap for the given lock txid."""
+    now = datetime(2025, 5, 29, 12, 0, 0, tzinfo=timezone.utc)
+    return AtomicSwap(
+        swap_id=f"{txid}:0",
+        lock_transaction=HTLCTransaction(
+            txid=txid,
+            version=2,
+            locktime=0,
+            byte_size=250,
+            weight_units=1000,
+            htlc_classification=HTLCType.LOCK,
+            value_sats=10000000,
+            output_index=0,
+        ),
+        current_state=SwapState.LOCKED,
+        btc_amount=Decimal("0.1"),
+        detected_at=now,
+        last_updated=now,
+    )
+
+
+class TestPendingSweep:
+    """Test the pending swap sweep."""
+
+    @pytest.mark.asyncio
+    async def test_prices_and_notifies_pending_swap(self, orchestrator, db):
+        """Test that a locked swap is priced, saved and notified once."""
+        swap = make_swap("a" * 64)
+        await db.save_swap(swap)
+
+        await orchestrator._sweep_pending_swaps()
+        await orchestrator._sweep_pending_swaps()
+
+        stored = await db.get_swap(swap.swap_id)
+        assert stored.btc_xmr_rate == Decimal("150")
+        assert stored.xmr_amount == Decimal("15.0")
+        assert stored.notification_sent == "1234567890"
+        notify_swap = orchestrator.notification_mgr.notify_swap
+        notify_swap.assert_awaited_once()
+        assert notify_swap.await_args.args[0].xmr_amount == Decimal("15.0")
+
+    @pytest.mark.asyncio
+    async def test_state_saved_while_notifying_is_kept(self, orchestrator, db):
+        """Test that a redeem seen mid-sweep isn't overwritten by stale data."""
+        swap = make_swap("b" * 64)
+        await db.save_swap(swap)
+
+        async def redeem_while_notifying(notified_swap):
+            # The watcher sees the redeem while the tweet is still going out
+            redeemed = await db.get_swap(notified_swap.swap_id)
+            redeemed.current_state = SwapState.REDEEMED
+            await db.save_swap(redeemed)
+            return "1234567890"
+
+        orchestrator.notification_mgr.notify_swap.side_effect = redeem_while_notifying
+        await orchestrator._sweep_pending_swaps()
+
+        db._by_id.clear()
+        stored = await db.get_swap(swap.swap_id)
+        assert stored.current_state == SwapState.REDEEMED
+        assert stored.xmr_amount == Decimal("15.0")
+
+    @pytest.mark.asyncio
+    async def test_restart_does_not_renotify(self, orchestrator, db):
+        """Test that a fresh orchestrator skips swaps already notified about."""
+        swap = make_swap("c" * 64)
+        await db.save_swap(swap)
+        await orchestrator._sweep_pending_swaps()
+
+        restarted = make_orchestrator(db)
+        await restarted._sweep_pending_swaps()
+
+        restarted.notification_mgr.notify_swap.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failed_notification_is_retried(self, orchestrator, db):
+        """Test that a swap stays pending until its notification goes out."""
+        swap = make_swap("d" * 64)
+        await db.save_swap(swap)
+        notify_swap = orchestrator.notification_mgr.notify_swap
+        notify_swap.side_effect = [None, "1234567890"]
+
+        await orchestrator._sweep_pending_swaps()
+        assert (await db.get_swap(swap.swap_id)).notification_sent is None
+
+        await orchestrator._sweep_pending_swaps()
+        assert (await db.get_swap(swap.swap_id)).notification_sent == "1234567890"
+        assert notify_swap.await_count == 2
+        # Pricing was saved on the first pass and isn't fetched again
+        orchestrator.price_service.get_btc_to_xmr_rate.assert_awaited_once()
+
+
+class TestBackfillPipeline:
+    """Test the historical backfill pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_writer_failure_stops_producer(self):
+        """Test that a failed writer is raised instead of hanging the producer."""
+        watcher = Mock(BACKFILL_BATCH_SIZE=1)
+        watcher.fetch_block = AsyncMock(return_value={})
+        # More swaps than the queue holds, so the producer blocks on a full queue
+        watcher.scan_block = AsyncMock(return_value=[Mock()] * 200)
+        swap_db = Mock(save_swaps=AsyncMock(side_effect=RuntimeError("disk full")))
+        orchestrator = SwapOrchestrator(
+            mempool_watcher=watcher,
+            price_service=Mock(),
+            notification_mgr=Mock(),
+            swap_db=swap_db,
+            enable_health_server=False,
+        )
+
+        with pytest.raises(RuntimeError, match="disk full"):
+            await asyncio.wait_for(
+                orchestrator._run_backfill_pipeline(100, 101, concurrency=2), 5
+            )
+        watcher.end_backfill.assert_called_once()
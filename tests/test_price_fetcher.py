@@ -1,12 +1,17 @@
 """Tests for price fetcher."""
 
+import asyncio
+import time
+from datetime import datetime
 from decimal import Decimal
 from unittest.mock import Mock, patch
 
+import orjson
 import pytest
 import pytest_asyncio
 
-from comit_swap_bot.price_fetcher import PriceFetcher
+from comit_swap_bot.config import config
+from comit_swap_bot.price_fetcher import RATE_TTL, PriceFetcher
 
 
 @pytest_asyncio.fixture
@@ -29,7 +34,7 @@ class TestPriceFetcher:
         with patch.object(price_fetcher.client, "get") as mock_get:
             # Create a proper mock response
             mock_resp = Mock()
-            mock_resp.json.return_value = mock_response  # Synchronous json() method
+            mock_resp.content = orjson.dumps(mock_response)
             mock_resp.raise_for_status.return_value = (
                 None  # Synchronous raise_for_status()
             )
@@ -50,6 +55,23 @@ class TestPriceFetcher:
 
             assert xmr_amount == Decimal("3.85")  # 0.1 * 38.5
 
+    @pytest.mark.asyncio
+    async def test_convert_xmr_to_btc(self, price_fetcher):
+        """Test XMR to BTC conversion uses the cached reciprocal."""
+        mock_response = {"bitcoin": {"usd": 50000}, "monero": {"usd": 200}}
+
+        with patch.object(price_fetcher.client, "get") as mock_get:
+            mock_resp = Mock()
+            mock_resp.content = orjson.dumps(mock_response)
+            mock_resp.raise_for_status.return_value = None
+            mock_get.return_value = mock_resp
+
+            assert await price_fetcher.get_btc_to_xmr_rate() == Decimal("250")
+            btc_amount = await price_fetcher.convert_xmr_to_btc(Decimal("25"))
+
+            assert btc_amount == Decimal("0.1")  # 25 * 200 / 50000
+            assert mock_get.call_count == 1
+
     @pytest.mark.asyncio
     async def test_caching(self, price_fetcher):
         """Test that prices are cached."""
@@ -58,7 +80,7 @@ class TestPriceFetcher:
         with patch.object(price_fetcher.client, "get") as mock_get:
             # Create a proper mock response
             mock_resp = Mock()
-            mock_resp.json.return_value = mock_response  # Synchronous json() method
+            mock_resp.content = orjson.dumps(mock_response)
             mock_resp.raise_for_status.return_value = (
                 None  # Synchronous raise_for_status()
             )
@@ -72,3 +94,95 @@ class TestPriceFetcher:
             assert rate1 == rate2
             # Should only call API once due to caching
             assert mock_get.call_count == 1
+
+            # Once the TTL has passed the rate is fetched again
+            monotonic = time.monotonic
+            with patch(
+                "comit_swap_bot.price_fetcher.time.monotonic",
+                lambda: monotonic() + RATE_TTL,
+            ):
+                await price_fetcher.get_btc_to_xmr_rate()
+            assert mock_get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_request(self, price_fetcher):
+        """Test that concurrent cache misses coalesce into one API call."""
+        mock_resp = Mock()
+        mock_resp.content = orjson.dumps(
+            {"bitcoin": {"usd": 50000}, "monero": {"usd": 200}}
+        )
+        mock_resp.raise_for_status.return_value = None
+
+        async def slow_get(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return mock_resp
+
+        with patch.object(
+            price_fetcher.client, "get", side_effect=slow_get
+        ) as mock_get:
+            rates = await asyncio.gather(
+                *(price_fetcher.get_btc_to_xmr_rate() for _ in range(5))
+            )
+
+            assert rates == [Decimal("250")] * 5
+            assert mock_get.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_historical_rate_disk_cache(self, tmp_path):
+        """Test that historical rates persist across fetcher instances."""
+        cache_config = config.model_copy(
+            update={"enable_price_cache": True, "price_cache_dir": str(tmp_path)}
+        )
+        history = {"market_data": {"current_price": {"btc": 0.004}}}
+        mock_resp = Mock()
+        mock_resp.content = orjson.dumps(history)
+        mock_resp.raise_for_status.return_value = None
+        when = datetime(2025, 5, 29)
+
+        with patch("comit_swap_bot.price_fetcher.config", cache_config):
+            fetcher = PriceFetcher()
+            with patch.object(
+                fetcher.client, "get", return_value=mock_resp
+            ) as mock_get:
+                assert await fetcher.get_historical_rate(when) == Decimal("250")
+                # One lookup covers both assets
+                mock_get.assert_called_once()
+            await fetcher.close()
+
+            fetcher = PriceFetcher()
+            disk = await fetcher._get_disk()
+            with (
+                patch.object(fetcher.client, "get") as mock_get,
+                patch.object(disk, "get", wraps=disk.get) as disk_get,
+            ):
+                assert await fetcher.get_historical_rate(when) == Decimal("250")
+                assert await fetcher.get_historical_rate(when) == Decimal("250")
+                mock_get.assert_not_called()
+                # Repeat lookups are answered from memory
+                disk_get.assert_called_once()
+            await fetcher.close()
+
+    @pytest.mark.asyncio
+    async def test_unusable_disk_cache_is_skipped(self, tmp_path):
+        """Test that a cache dir that can't be created disables the disk cache."""
+        blocker = tmp_path / "not-a-dir"
+        blocker.write_text("")
+        cache_config = config.model_copy(
+            update={
+                "enable_price_cache": True,
+                "price_cache_dir": str(blocker / "prices"),
+            }
+        )
+        history = {"market_data": {"current_price": {"btc": 0.004}}}
+        mock_resp = Mock()
+        mock_resp.content = orjson.dumps(history)
+        mock_resp.raise_for_status.return_value = None
+
+        with patch("comit_swap_bot.price_fetcher.config", cache_config):
+            fetcher = PriceFetcher()
+            with patch.object(fetcher.client, "get", return_value=mock_resp):
+                rate = await fetcher.get_historical_rate(datetime(2025, 5, 29))
+            assert await fetcher._get_disk() is None
+            await fetcher.close()
+
+        assert rate == Decimal("250")
@@ -1,13 +1,36 @@
 """Tests for swap watcher."""
 
 from decimal import Decimal
+from unittest.mock import Mock, patch
+from uuid import uuid4
 
 import pytest
 import pytest_asyncio
 
 from comit_swap_bot.database import SwapDatabase
 from comit_swap_bot.models import SwapState
-from comit_swap_bot.swap_watcher import SwapWatcher
+from comit_swap_bot.swap_watcher import SwapWatcher, _btc_to_sats
+
+# A reasonable timelock: 1703980800 = 2023-12-30 12:00:00
+_TIMELOCK_BYTES = (1703980800).to_bytes(4, byteorder="little")
+
+# Valid HTLC script, built once and shared by every test
+_HTLC_SCRIPT_HEX = (
+    b"\x63"  # OP_IF
+    + b"\xa8\x20"  # OP_SHA256 PUSH32
+    + b"a" * 32  # <secret_hash>
+    + b"\x88"  # OP_EQUALVERIFY
+    + b"\x76\xa9\x14"  # OP_DUP OP_HASH160 PUSH20
+    + b"b" * 20  # <recipient>
+    + b"\x88\xac"  # OP_EQUALVERIFY OP_CHECKSIG
+    + b"\x67"  # OP_ELSE
+    + _TIMELOCK_BYTES
+    + b"\xb1\x75"  # OP_CHECKLOCKTIMEVERIFY OP_DROP
+    + b"\x76\xa9\x14"  # OP_DUP OP_HASH160 PUSH20
+    + b"c" * 20  # <sender>
+    + b"\x88\xac"  # OP_EQUALVERIFY OP_CHECKSIG
+    + b"\x68"  # OP_ENDIF
+).hex()
 
 
 @pytest_asyncio.fixture
@@ -31,33 +54,7 @@ class TestSwapWatcher:
 
     def test_htlc_pattern_matching(self, watcher):
         """Test HTLC script pattern detection."""
-        # Valid HTLC script bytes (simplified for testing)
-        # Use a reasonable timelock (e.g., 1703980800 = 2023-12-30 12:00:00)
-        timelock_bytes = (1703980800).to_bytes(4, byteorder="little")
-        valid_script = (
-            b"\x63"  # OP_IF
-            b"\xa8\x20" + b"a" * 32 + b"\x88"  # OP_SHA256 <secret_hash> OP_EQUALVERIFY
-            b"\x76\xa9\x14"
-            + b"b"
-            * 20
-            + b"\x88\xac"  # DUP HASH160 <recipient> EQUALVERIFY CHECKSIG
-            b"\x67"  # OP_ELSE
-            + timelock_bytes
-            + b"\xb1\x75"  # <timelock> CHECKLOCKTIMEVERIFY DROP
-            + b"\x76\xa9\x14"
-            + b"c" * 20
-            + b"\x88\xac"  # DUP HASH160 <sender> EQUALVERIFY CHECKSIG
-            + b"\x68"  # OP_ENDIF
-        )
-
-        # Test detection
-        output = {"scriptPubKey": {"hex": valid_script.hex()}}
-        htlc = watcher._detect_htlc_script(output)
-
-        assert htlc is not None
-
-        # Test detection
-        output = {"scriptPubKey": {"hex": valid_script.hex()}}
+        output = {"scriptPubKey": {"hex": _HTLC_SCRIPT_HEX}}
         htlc = watcher._detect_htlc_script(output)
 
         assert htlc is not None
@@ -66,25 +63,46 @@ class TestSwapWatcher:
         assert htlc.sender_pubkey_hash == "63" * 20  # hex of b"c" * 20
         assert htlc.timelock_height > 0
 
+    def test_btc_to_sats_is_exact(self):
+        """Test BTC amounts convert to satoshis without float drift."""
+        # 0.29 * 1e8 is 28999999.999999996 in binary floating point
+        assert _btc_to_sats(0.29) == 29_000_000
+        assert _btc_to_sats(Decimal("0.29")) == 29_000_000
+        assert _btc_to_sats(1) == 100_000_000
+
+    def test_htlc_prefilter(self, watcher):
+        """Test the prefilter rejects common scripts but keeps short HTLCs."""
+        p2wpkh = b"\x00\x14" + b"d" * 20
+        output = {"scriptPubKey": {"hex": p2wpkh.hex()}}
+        assert watcher._detect_htlc_script(output) is None
+
+        # Shortest HTLC the patterns accept: a 1-byte timelock
+        shortest = (
+            b"\x63\xa8\x20"
+            + b"a" * 32
+            + b"\x88\x76\xa9\x14"
+            + b"b" * 20
+            + b"\x88\xac\x67\x01\xb1\x75\x76\xa9\x14"
+            + b"c" * 20
+            + b"\x88\xac\x68"
+        )
+        assert len(shortest) == watcher.HTLC_MIN_SCRIPT_LEN
+        output = {"scriptPubKey": {"hex": shortest.hex()}}
+        assert watcher._detect_htlc_script(output).timelock_height == 1
+
+        # Scripts past the longest (9-byte timelock) HTLC are rejected on length
+        output = {"scriptPubKey": {"hex": _HTLC_SCRIPT_HEX + "00" * 6}}
+        assert watcher._detect_htlc_script(output) is None
+        # Within range, trailing bytes after OP_ENDIF still don't match
+        output = {"scriptPubKey": {"hex": _HTLC_SCRIPT_HEX + "00"}}
+        assert watcher._detect_htlc_script(output) is None
+
     @pytest.mark.asyncio
     async def test_swap_detection(self, watcher, db):
         """Test full swap detection flow."""
         # Mock transaction data
         txid = "abc123"
-        timelock_bytes = (1703980800).to_bytes(4, byteorder="little")
-        output = {
-            "scriptPubKey": {
-                "hex": (
-                    b"\x63"
-                    b"\xa8\x20" + b"x" * 32 + b"\x88"
-                    b"\x76\xa9\x14" + b"y" * 20 + b"\x88\xac"
-                    b"\x67" + timelock_bytes + b"\xb1\x75"  # Valid timelock
-                    b"\x76\xa9\x14" + b"z" * 20 + b"\x88\xac"
-                    b"\x68"
-                ).hex()
-            },
-            "value": 0.1,
-        }
+        output = {"scriptPubKey": {"hex": _HTLC_SCRIPT_HEX}, "value": 0.1}
 
         # Process HTLC detection
         htlc_script = watcher._detect_htlc_script(output)
@@ -102,27 +120,14 @@ class TestSwapWatcher:
         """Test HTLC redeem detection."""
         # First create a locked HTLC
         lock_txid = "lock123"
-        timelock_bytes = (1703980800).to_bytes(4, byteorder="little")
-        output = {
-            "scriptPubKey": {
-                "hex": (
-                    b"\x63"
-                    b"\xa8\x20" + b"s" * 32 + b"\x88"
-                    b"\x76\xa9\x14" + b"r" * 20 + b"\x88\xac"
-                    b"\x67" + timelock_bytes + b"\xb1\x75"  # Valid timelock
-                    b"\x76\xa9\x14" + b"s" * 20 + b"\x88\xac"
-                    b"\x68"
-                ).hex()
-            },
-            "value": 0.05,
-        }
+        output = {"scriptPubKey": {"hex": _HTLC_SCRIPT_HEX}, "value": 0.05}
 
         htlc_script = watcher._detect_htlc_script(output)
         await watcher._handle_htlc_detection(lock_txid, 0, output, htlc_script)
 
         # Add to pending HTLCs
         swap = await db.get_swap_by_lock_txid(lock_txid)
-        watcher._pending_htlcs[lock_txid] = swap.lock_transaction
+        watcher._pending_htlcs[lock_txid] = swap.lock_transaction.value_sats
 
         # Now simulate a redeem
         redeem_txid = "redeem456"
@@ -143,3 +148,70 @@ class TestSwapWatcher:
         assert swap.redeem_transaction is not None
         assert swap.redeem_transaction.txid == redeem_txid
         assert swap.redeem_transaction.revealed_secret == "s" * 64
+
+    @pytest.mark.asyncio
+    async def test_backfill_scan_defers_saves_for_batching(self, watcher, db):
+        """Test that swaps found while backfilling are returned for batch saving."""
+        output = {"scriptPubKey": {"hex": _HTLC_SCRIPT_HEX}, "value": 0.2}
+        first_txid, second_txid = uuid4().hex, uuid4().hex
+        transactions = [
+            {"txid": first_txid, "vout": [output], "vin": []},
+            {"txid": second_txid, "vout": [output], "vin": []},
+            {
+                "txid": uuid4().hex,
+                "vout": [],
+                "vin": [{"txid": second_txid, "witness": ["sig", "b" * 64, "key"]}],
+            },
+        ]
+
+        watcher.begin_backfill()
+        try:
+            swaps = await watcher.scan_block(800000, transactions)
+        finally:
+            watcher.end_backfill()
+
+        assert [swap.lock_transaction.txid for swap in swaps] == [
+            first_txid,
+            second_txid,
+        ]
+        assert await db.get_swap_by_lock_txid(first_txid) is None
+        # The spend was matched against the not-yet-saved lock
+        assert swaps[1].current_state == SwapState.REDEEMED
+
+        await db.save_swaps(swaps)
+
+        assert await db.get_swap_by_lock_txid(first_txid) is not None
+        redeemed = await db.get_swap_by_lock_txid(second_txid)
+        assert redeemed.current_state == SwapState.REDEEMED
+
+        # Saving again updates the existing row instead of failing
+        swap = swaps[0]
+        swap.btc_xmr_rate = Decimal("150")
+        await db.save_swaps([swap])
+        updated = await db.get_swap(swap.swap_id)
+        assert updated.btc_xmr_rate == Decimal("150")
+
+    @pytest.mark.asyncio
+    async def test_fetch_block_pages_transactions(self, watcher):
+        """Test that block transactions are fetched in pages, in block order."""
+        block_txids = [f"tx{i}" for i in range(60)]
+
+        async def fake_get(url):
+            resp = Mock()
+            resp.raise_for_status.return_value = None
+            if url.endswith("/block-height/800000"):
+                resp.text = "blockhash\n"
+            elif url.endswith("/block/blockhash"):
+                resp.json.return_value = {"tx_count": len(block_txids)}
+            else:
+                start = int(url.rsplit("/", 1)[1])
+                page = block_txids[start : start + watcher.BLOCK_TXS_PAGE_SIZE]
+                resp.json.return_value = [{"txid": txid} for txid in page]
+            return resp
+
+        with patch.object(watcher.client, "get", side_effect=fake_get) as mock_get:
+            transactions = await watcher.fetch_block(800000)
+
+        assert [tx["txid"] for tx in transactions] == block_txids
+        # Height lookup, block header, then three pages of 25
+        assert mock_get.call_count == 5